@@ -0,0 +1,116 @@
+"""
+تتبع إصدارات نتائج التحليل لإرجاع الأزواج المتغيرة فقط منذ آخر طلب
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+
+def fingerprint(analysis: Dict) -> Tuple:
+    """بصمة مخرجات التحليل المعروضة: إشارات الإجماع والاستراتيجيات وثقتها (بدقة العرض)
+
+    السعر الحالي لا يدخل في البصمة حتى لا يُعتبر كل زوج متغيراً في كل جولة
+    """
+    if 'error' in analysis:
+        return ('error', analysis['error'])
+
+    consensus = analysis.get('consensus', {})
+    strategies = tuple(
+        (name, result.signal, round(result.confidence, 1))
+        for name, result in analysis.get('strategies', {}).items()
+    )
+    return (consensus.get('signal'), round(consensus.get('confidence', 0), 1), strategies)
+
+
+class AnalysisVersions:
+    """رقم إصدار عام يزداد عند أي تغيير، مع آخر إصدار تغيّر فيه كل زوج وسعره"""
+
+    def __init__(self):
+        # معرّف فريد لعمر العملية: الرموز من عملية سابقة تؤدي إلى إرجاع النتيجة كاملة
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.version = 0
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._latest: Dict[str, Dict] = {}  # آخر تحليل مسجل لكل زوج
+        self._changed_at: Dict[str, int] = {}
+        self._prices: Dict[str, Tuple[Any, int]] = {}  # الزوج -> (آخر سعر، إصدار تغيّره)
+        self._removed_at: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def token(self) -> str:
+        return f'{self.epoch}-{self.version}'
+
+    def _parse(self, token: Optional[str]) -> Optional[int]:
+        """رقم الإصدار من الرمز، أو None إذا كان غير صالح أو من عملية أخرى"""
+        if not token:
+            return None
+        epoch, _, version = token.rpartition('-')
+        if epoch != self.epoch or not version.isdigit() or int(version) > self.version:
+            return None
+        return int(version)
+
+    def apply(self, analysis_results: Dict[str, Dict], since: Optional[str]) -> Dict:
+        """تسجيل نتائج جولة تحليل وإرجاع التغييرات منذ الرمز since مع الرمز الجديد
+
+        التسجيل والمقارنة وقراءة الرمز تتم تحت قفل واحد، وتُعاد آخر نتيجة مسجلة لكل زوج
+        (لا نسخة هذا الطلب)، حتى لا تفوت الطلبات المتزامنة تغييراً سجله طلب آخر
+        """
+        with self._lock:
+            self._update(analysis_results)
+            since_version = self._parse(since)
+            if since_version is None:
+                return {
+                    'analysis': dict(self._latest),
+                    'removed_pairs': [],
+                    'prices': {},
+                    'full': True,
+                    'version': self.token
+                }
+
+            changed = {
+                pair: self._latest[pair] for pair, version in self._changed_at.items()
+                if version > since_version
+            }
+            return {
+                'analysis': changed,
+                'removed_pairs': [pair for pair, version in self._removed_at.items() if version > since_version],
+                # أسعار الأزواج التي لم تتغير بطاقاتها وتغير سعرها فقط
+                'prices': {
+                    pair: price for pair, (price, version) in self._prices.items()
+                    if version > since_version and pair not in changed
+                },
+                'full': False,
+                'version': self.token
+            }
+
+    def _update(self, analysis_results: Dict[str, Dict]):
+        """زيادة الإصدار مرة واحدة إذا تغيّر أي زوج أو سعره أو حُذف (يُستدعى مع القفل)"""
+        changed = []
+        repriced = []
+        for pair, analysis in analysis_results.items():
+            self._latest[pair] = analysis
+            current = fingerprint(analysis)
+            if self._fingerprints.get(pair) != current:
+                self._fingerprints[pair] = current
+                changed.append(pair)
+            price = analysis.get('current_price')
+            if price is not None and (pair not in self._prices or self._prices[pair][0] != price):
+                repriced.append((pair, price))
+
+        removed = [pair for pair in self._fingerprints if pair not in analysis_results]
+        if not changed and not repriced and not removed:
+            return
+
+        self.version += 1
+        for pair in changed:
+            self._changed_at[pair] = self.version
+            self._removed_at.pop(pair, None)
+        for pair, price in repriced:
+            self._prices[pair] = (price, self.version)
+        for pair in removed:
+            del self._fingerprints[pair]
+            self._latest.pop(pair, None)
+            self._changed_at.pop(pair, None)
+            self._prices.pop(pair, None)
+            self._removed_at[pair] = self.version
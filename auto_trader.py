@@ -0,0 +1,208 @@
+"""
+وضع التداول التلقائي: تحويل الإشارات عالية الثقة إلى أوامر مباشرة
+مع فترة تهدئة لكل زوج وتحديد معدل الأوامر وحد للتعرض ومنع التكرار
+"""
+
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class TokenBucket:
+    """محدد معدل من نوع دلو الرموز (Token Bucket)"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # عدد الرموز المضافة في الثانية
+        self.capacity = capacity  # أقصى عدد من الرموز (حجم الدفعة)
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def reconfigure(self, rate: float, capacity: float):
+        """تغيير المعدل والسعة مع الاحتفاظ بالرموز الحالية (بحد أقصى السعة الجديدة)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            self.capacity = capacity
+            self.tokens = min(self.tokens, capacity)
+
+    def try_acquire(self) -> bool:
+        """استهلاك رمز إن توفر"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def _parse_bool(value: Any) -> bool:
+    """قراءة قيمة منطقية بصرامة ("false" كنص لا تُعتبر True)"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+        return value.strip().lower() == 'true'
+    raise ValueError(f'قيمة منطقية غير صالحة: {value!r}')
+
+
+def _parse_number(name: str, value: Any, minimum: float = 0.0, maximum: float = math.inf,
+                  allow_minimum: bool = False) -> float:
+    """قراءة رقم محدود ضمن النطاق المسموح"""
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name}: قيمة رقمية غير صالحة: {value!r}')
+    if not math.isfinite(number):
+        raise ValueError(f'{name}: يجب أن تكون القيمة عدداً محدوداً')
+    if number < minimum or (number == minimum and not allow_minimum) or number > maximum:
+        raise ValueError(f'{name}: القيمة {number} خارج النطاق المسموح')
+    return number
+
+
+class Reservation:
+    """حجز أمر تلقائي قبل إرساله، يمكن التراجع عنه إذا فشل الأمر"""
+
+    __slots__ = ('pair', 'candle_time', 'position', 'previous_order_at', 'previous_candle')
+
+    def __init__(self, pair: str, candle_time: int, position: Tuple[float, float],
+                 previous_order_at: Optional[float], previous_candle: Optional[int]):
+        self.pair = pair
+        self.candle_time = candle_time
+        self.position = position
+        self.previous_order_at = previous_order_at
+        self.previous_candle = previous_candle
+
+
+class AutoTrader:
+    """قواعد التنفيذ التلقائي للإشارات"""
+
+    def __init__(self):
+        self.enabled = False
+        self.cooldown_seconds = 60.0  # فترة التهدئة لكل زوج
+        self.max_exposure_ratio = 0.2  # أقصى تعرض متزامن كنسبة من الرصيد
+        self.order_duration = 60  # مدة الصفقة بالثواني
+        self.rate_limiter = TokenBucket(rate=1.0, capacity=3)
+
+        self._last_order_at: Dict[str, float] = {}
+        self._last_candle: Dict[str, int] = {}
+        self._open_positions: List[Tuple[float, float]] = []  # (وقت الانتهاء، المبلغ)
+        self._lock = threading.Lock()
+
+    def configure(self, settings: Dict):
+        """تحديث الإعدادات من قاموس (مثل جسم طلب API)
+
+        تُتحقق جميع القيم أولاً، ولا يُطبق أي تغيير إذا كانت إحداها غير صالحة (ValueError)
+        """
+        updates = {}
+        if 'enabled' in settings:
+            updates['enabled'] = _parse_bool(settings['enabled'])
+        if 'cooldown_seconds' in settings:
+            # 0 يعطل فترة التهدئة (يبقى منع التكرار على نفس الشمعة)
+            updates['cooldown_seconds'] = _parse_number(
+                'cooldown_seconds', settings['cooldown_seconds'], allow_minimum=True
+            )
+        if 'max_exposure_ratio' in settings:
+            updates['max_exposure_ratio'] = _parse_number(
+                'max_exposure_ratio', settings['max_exposure_ratio'], maximum=1.0
+            )
+        if 'order_duration' in settings:
+            updates['order_duration'] = int(_parse_number(
+                'order_duration', settings['order_duration'], minimum=1, allow_minimum=True
+            ))
+        rate = self.rate_limiter.rate
+        capacity = self.rate_limiter.capacity
+        if 'orders_per_second' in settings:
+            rate = _parse_number('orders_per_second', settings['orders_per_second'])
+        if 'burst' in settings:
+            capacity = _parse_number('burst', settings['burst'], minimum=1, allow_minimum=True)
+
+        for name, value in updates.items():
+            setattr(self, name, value)
+        if 'orders_per_second' in settings or 'burst' in settings:
+            self.rate_limiter.reconfigure(rate, capacity)
+
+    def _prune_positions(self, now: float) -> float:
+        """حذف الصفقات المنتهية وإرجاع التعرض المفتوح (يُستدعى مع القفل)"""
+        self._open_positions = [p for p in self._open_positions if p[0] > now]
+        return sum(amount for _, amount in self._open_positions)
+
+    def open_exposure(self, now: Optional[float] = None) -> float:
+        """إجمالي مبالغ الصفقات التي لم تنتهِ مدتها بعد"""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._prune_positions(now)
+
+    def try_reserve(self, pair: str, candle_time: int, amount: float,
+                    balance: float) -> Tuple[Optional[Reservation], Optional[str]]:
+        """التحقق من إشارة وحجزها في خطوة ذرية واحدة
+
+        يعيد (الحجز، None) عند القبول أو (None، سبب الرفض)، فلا يمكن لطلبين متزامنين
+        التداول على نفس الشمعة
+        """
+        if not self.enabled:
+            return None, 'التداول التلقائي غير مفعل'
+
+        now = time.time()
+        with self._lock:
+            if self._last_candle.get(pair) == candle_time:
+                return None, 'تم التداول على هذه الشمعة مسبقاً'
+            if now - self._last_order_at.get(pair, 0) < self.cooldown_seconds:
+                return None, 'الزوج في فترة التهدئة'
+            if self._prune_positions(now) + amount > balance * self.max_exposure_ratio:
+                return None, 'تم تجاوز الحد الأقصى للتعرض'
+            if not self.rate_limiter.try_acquire():
+                return None, 'تم تجاوز معدل الأوامر'
+
+            reservation = Reservation(
+                pair, candle_time, (now + self.order_duration, amount),
+                self._last_order_at.get(pair), self._last_candle.get(pair)
+            )
+            self._last_order_at[pair] = now
+            self._last_candle[pair] = candle_time
+            self._open_positions.append(reservation.position)
+            return reservation, None
+
+    def release(self, reservation: Reservation):
+        """التراجع عن حجز أمر فشل إرساله (تحرير التعرض والتهدئة والشمعة)"""
+        with self._lock:
+            try:
+                self._open_positions.remove(reservation.position)
+            except ValueError:
+                pass
+            # الاستعادة فقط إذا لم يُحجز أمر أحدث لنفس الزوج
+            if self._last_candle.get(reservation.pair) == reservation.candle_time:
+                if reservation.previous_candle is None:
+                    del self._last_candle[reservation.pair]
+                else:
+                    self._last_candle[reservation.pair] = reservation.previous_candle
+                if reservation.previous_order_at is None:
+                    self._last_order_at.pop(reservation.pair, None)
+                else:
+                    self._last_order_at[reservation.pair] = reservation.previous_order_at
+
+    def forget_pair(self, pair: str):
+        """حذف حالة التهدئة وآخر شمعة لزوج محذوف (الصفقات المفتوحة تبقى ضمن التعرض)"""
+        with self._lock:
+            self._last_order_at.pop(pair, None)
+            self._last_candle.pop(pair, None)
+
+    def get_state(self) -> Dict:
+        """الحالة والإعدادات الحالية"""
+        return {
+            'enabled': self.enabled,
+            'cooldown_seconds': self.cooldown_seconds,
+            'max_exposure_ratio': self.max_exposure_ratio,
+            'order_duration': self.order_duration,
+            'orders_per_second': self.rate_limiter.rate,
+            'burst': self.rate_limiter.capacity,
+            'open_exposure': self.open_exposure()
+        }
@@ -0,0 +1,132 @@
+"""
+مجمّع اتصالات قابلة لإعادة الاستخدام مع الوسيط (Broker)
+مع إعادة الاتصال التلقائي والتراجع الأُسّي عند الفشل
+"""
+
+import asyncio
+import concurrent.futures
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, List, Optional, Tuple
+
+
+class BrokerConnection:
+    """اتصال واحد بالوسيط (محاكاة)"""
+
+    def __init__(self, connection_id: int):
+        self.connection_id = connection_id
+        self.is_open = False
+        self.opened_at: Optional[float] = None
+
+    async def open(self):
+        """فتح الاتصال (محاكاة: عند ربط وسيط حقيقي يتم هنا إنشاء الجلسة)"""
+        await asyncio.sleep(0)
+        self.is_open = True
+        self.opened_at = time.time()
+
+    def close(self):
+        """إغلاق الاتصال"""
+        self.is_open = False
+
+
+class ConnectionPool:
+    """مجمّع اتصالات محدود الحجم وآمن للاستخدام من عدة threads وحلقات أحداث"""
+
+    def __init__(self, size: int = 4, max_retries: int = 5,
+                 backoff_base: float = 0.1, backoff_max: float = 5.0):
+        self.size = size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._idle: List[BrokerConnection] = []
+        self._created = 0
+        # المنتظرون عند امتلاء المجمّع (مستقبلات آمنة بين الـ threads وحلقات الأحداث)
+        self._waiters: Deque[concurrent.futures.Future] = deque()
+        self._lock = threading.Lock()
+
+    def _take(self) -> Tuple[Optional[BrokerConnection], Optional[concurrent.futures.Future]]:
+        """أخذ اتصال خامل أو حجز مكان لاتصال جديد، أو الانضمام إلى طابور الانتظار"""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), None
+            if self._created < self.size:
+                self._created += 1
+                return BrokerConnection(self._created), None
+            waiter = concurrent.futures.Future()
+            self._waiters.append(waiter)
+            return None, waiter
+
+    def _release(self, connection: BrokerConnection):
+        """إعادة الاتصال: يُسلَّم مباشرة لأول منتظر وإلا يعود إلى القائمة الخاملة"""
+        with self._lock:
+            if not connection.is_open:
+                # اتصال تالف: يُستبدل باتصال جديد يُفتح عند الاستخدام
+                connection = BrokerConnection(connection.connection_id)
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                # تخطي المنتظرين الذين أُلغيت طلباتهم
+                if waiter.set_running_or_notify_cancel():
+                    waiter.set_result(connection)
+                    return
+            self._idle.append(connection)
+
+    async def _wait(self, waiter: concurrent.futures.Future) -> BrokerConnection:
+        try:
+            return await asyncio.wrap_future(waiter)
+        except asyncio.CancelledError:
+            # إذا سُلِّم الاتصال قبل الإلغاء يجب إعادته حتى لا يضيع مكانه
+            if not waiter.cancel() and not waiter.cancelled():
+                self._release(waiter.result())
+            raise
+
+    async def _ensure_open(self, connection: BrokerConnection):
+        """فتح الاتصال مع إعادة المحاولة والتراجع الأُسّي"""
+        for attempt in range(self.max_retries):
+            try:
+                await connection.open()
+                return
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    raise ConnectionError(f'فشل الاتصال بالوسيط بعد {self.max_retries} محاولات: {e}')
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+    @asynccontextmanager
+    async def acquire(self):
+        """استعارة اتصال من المجمّع وإعادته بعد الاستخدام"""
+        connection, waiter = self._take()
+        if waiter is not None:
+            connection = await self._wait(waiter)
+
+        try:
+            if not connection.is_open:
+                await self._ensure_open(connection)
+            yield connection
+        except Exception:
+            # أي خطأ أثناء الطلب يجعل الاتصال مشكوكاً فيه فيُغلق ويُعاد فتحه لاحقاً
+            connection.close()
+            raise
+        finally:
+            self._release(connection)
+
+    def close_all(self):
+        """إغلاق جميع الاتصالات الخاملة"""
+        with self._lock:
+            for connection in self._idle:
+                connection.close()
+            self._created -= len(self._idle)
+            self._idle = []
+
+    def get_stats(self) -> dict:
+        """إحصائيات المجمّع"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle)
+            }
@@ -0,0 +1,206 @@
+"""
+محرك الإجماع الموزون المراعي للارتباط بين الاستراتيجيات
+
+- يتعلم أوزاناً لكل استراتيجية ولكل زوج من نتائج الصفقات المسجلة
+- يُحدِّث الأوزان تدريجياً عند تسوية كل صفقة
+- يخفض وزن الاستراتيجيات المترابطة (مثل تتبع الاتجاه والمضاربة) حتى لا تُحتسب مرتين
+- يحسب الإجماع لجميع الأزواج دفعة واحدة بعمليات متجهة
+"""
+
+import threading
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+SIGNAL_VALUES = {'CALL': 1.0, 'PUT': -1.0}
+
+
+class ConsensusEngine:
+    """محرك الإجماع الموزون"""
+
+    def __init__(self, strategy_names: List[str]):
+        self.strategy_names = list(strategy_names)
+        self._strategy_index = {name: i for i, name in enumerate(self.strategy_names)}
+        n = len(self.strategy_names)
+
+        self.decay = 0.98  # معامل نسيان النتائج القديمة
+        self.prior_accuracy = 0.6  # دقة مبدئية مفترضة قبل وجود نتائج
+        self.prior_strength = 10.0  # وزن الدقة المبدئية (بعدد صفقات وهمية)
+        self.pair_shrinkage = 20.0  # مدى سحب دقة الزوج نحو الدقة العامة للاستراتيجية
+        self.correlation_decay = 0.99
+
+        # إحصائيات عامة لكل استراتيجية
+        self._global_wins = np.zeros(n)
+        self._global_trials = np.zeros(n)
+
+        # إحصائيات لكل زوج × استراتيجية
+        self._pair_index: Dict[str, int] = {}
+        self._pair_wins = np.zeros((0, n))
+        self._pair_trials = np.zeros((0, n))
+
+        # عزوم التصويت المشتركة لتقدير الارتباط بين الاستراتيجيات
+        self._co_votes = np.zeros((n, n))
+        self._co_weight = 0.0
+
+        self._lock = threading.Lock()
+
+    def _rows(self, pairs: Iterable[str]) -> np.ndarray:
+        """أرقام صفوف الأزواج مع إضافة الأزواج الجديدة"""
+        rows = []
+        new_pairs = 0
+        for pair in pairs:
+            if pair not in self._pair_index:
+                self._pair_index[pair] = len(self._pair_index)
+                new_pairs += 1
+            rows.append(self._pair_index[pair])
+
+        if new_pairs:
+            padding = np.zeros((new_pairs, len(self.strategy_names)))
+            self._pair_wins = np.vstack([self._pair_wins, padding])
+            self._pair_trials = np.vstack([self._pair_trials, padding])
+        return np.asarray(rows, dtype=int)
+
+    def encode(self, strategy_signals: Dict[str, str]) -> np.ndarray:
+        """تحويل إشارات الاستراتيجيات إلى متجه (+1 شراء، -1 بيع، 0 انتظار)"""
+        votes = np.zeros(len(self.strategy_names))
+        for name, signal in strategy_signals.items():
+            index = self._strategy_index.get(name)
+            if index is not None:
+                votes[index] = SIGNAL_VALUES.get(signal, 0.0)
+        return votes
+
+    def observe(self, votes: np.ndarray):
+        """تحديث تقدير الارتباط من مصفوفة تصويت (أزواج × استراتيجيات) لجولة تحليل"""
+        if votes.size == 0:
+            return
+        with self._lock:
+            factor = self.correlation_decay ** len(votes)
+            self._co_votes = self._co_votes * factor + votes.T @ votes
+            self._co_weight = self._co_weight * factor + len(votes)
+
+    def correlation(self) -> np.ndarray:
+        """مصفوفة الارتباط بين تصويتات الاستراتيجيات"""
+        if self._co_weight == 0:
+            return np.eye(len(self.strategy_names))
+        moments = self._co_votes / self._co_weight
+        scale = np.sqrt(np.clip(np.diag(moments), 1e-12, None))
+        return moments / np.outer(scale, scale)
+
+    def record_outcome(self, pair: str, strategy_signals: Dict[str, str], direction: str, result: str):
+        """تحديث الأوزان تدريجياً عند تسوية صفقة"""
+        if result not in ('WIN', 'LOSS') or direction not in SIGNAL_VALUES:
+            return
+
+        # الاتجاه الذي كان صحيحاً فعلاً
+        winning_value = SIGNAL_VALUES[direction] * (1.0 if result == 'WIN' else -1.0)
+        votes = self.encode(strategy_signals)
+        voted = votes != 0
+        correct = (votes == winning_value) & voted
+
+        with self._lock:
+            row = self._rows([pair])[0]
+            self._global_wins[voted] = self._global_wins[voted] * self.decay + correct[voted]
+            self._global_trials[voted] = self._global_trials[voted] * self.decay + 1
+            self._pair_wins[row, voted] = self._pair_wins[row, voted] * self.decay + correct[voted]
+            self._pair_trials[row, voted] = self._pair_trials[row, voted] * self.decay + 1
+
+    def fit(self, trades: Iterable):
+        """إعادة تعلم الأوزان من سجل صفقات (أو نتائج اختبار رجعي)"""
+        with self._lock:
+            n = len(self.strategy_names)
+            self._global_wins = np.zeros(n)
+            self._global_trials = np.zeros(n)
+            self._pair_wins = np.zeros((len(self._pair_index), n))
+            self._pair_trials = np.zeros((len(self._pair_index), n))
+
+        for trade in trades:
+            if trade.strategies:
+                self.record_outcome(trade.pair, trade.strategies, trade.direction, trade.result)
+
+    def weights(self, pairs: List[str]) -> np.ndarray:
+        """الأوزان الفعالة (أزواج × استراتيجيات) بعد خصم الارتباط"""
+        with self._lock:
+            rows = self._rows(pairs)
+            global_accuracy = (
+                (self._global_wins + self.prior_accuracy * self.prior_strength)
+                / (self._global_trials + self.prior_strength)
+            )
+            pair_accuracy = (
+                (self._pair_wins[rows] + global_accuracy * self.pair_shrinkage)
+                / (self._pair_trials[rows] + self.pair_shrinkage)
+            )
+            correlation = self.correlation()
+
+        # وزن لوغاريتمي الأرجحية: الاستراتيجية بدقة 50% أو أقل لا وزن لها
+        accuracy = np.clip(pair_accuracy, 1e-6, 1 - 1e-6)
+        weights = np.clip(np.log(accuracy / (1 - accuracy)), 0, None)
+
+        # خصم الاستراتيجيات المترابطة إيجابياً مع غيرها
+        redundancy = 1 + np.clip(correlation - np.eye(len(self.strategy_names)), 0, None).sum(axis=1)
+        return weights / redundancy
+
+    def score(self, pairs: List[str], votes: np.ndarray, confidences: np.ndarray) -> List[Dict]:
+        """حساب الإجماع الموزون لجميع الأزواج دفعة واحدة
+
+        votes و confidences مصفوفتان (أزواج × استراتيجيات)
+        """
+        if not pairs:
+            return []
+
+        weights = self.weights(pairs) * (votes != 0)
+        call_weight = (weights * (votes > 0)).sum(axis=1)
+        put_weight = (weights * (votes < 0)).sum(axis=1)
+        total_weight = call_weight + put_weight
+
+        direction = np.sign(call_weight - put_weight)
+        agreeing = weights * (np.sign(votes) == direction[:, None])
+        safe_total = np.where(total_weight > 0, total_weight, 1)
+        # التقريب هنا (مصفوفياً) حتى تُرسل القيم بنفس دقة ثقة الاستراتيجيات في الاستجابات
+        strength = np.round(
+            np.where(total_weight > 0, np.maximum(call_weight, put_weight) / safe_total * 100, 0), 2
+        )
+        confidence = np.round((agreeing * confidences).sum(axis=1) / safe_total, 2)
+        score = np.round((call_weight - put_weight) / safe_total, 4)
+
+        call_count = (votes > 0).sum(axis=1)
+        put_count = (votes < 0).sum(axis=1)
+
+        results = []
+        for i in range(len(pairs)):
+            if direction[i] > 0:
+                signal = 'CALL'
+            elif direction[i] < 0:
+                signal = 'PUT'
+            else:
+                signal = 'HOLD'
+
+            results.append({
+                'signal': signal,
+                'strength': float(strength[i]) if signal != 'HOLD' else (50 if total_weight[i] > 0 else 0),
+                'confidence': float(confidence[i]) if signal != 'HOLD' else 0,
+                'score': float(score[i]),
+                'agreeing_strategies': int(max(call_count[i], put_count[i])),
+                'total_strategies': int(call_count[i] + put_count[i])
+            })
+        return results
+
+    def remove_pair(self, pair: str):
+        """حذف إحصائيات زوج دون التأثير على بقية الأزواج"""
+        with self._lock:
+            row = self._pair_index.pop(pair, None)
+            if row is None:
+                return
+            self._pair_wins = np.delete(self._pair_wins, row, axis=0)
+            self._pair_trials = np.delete(self._pair_trials, row, axis=0)
+            for name, index in self._pair_index.items():
+                if index > row:
+                    self._pair_index[name] = index - 1
+
+    def get_weights(self) -> Dict[str, Dict[str, float]]:
+        """الأوزان الحالية لكل زوج معروف (للعرض)"""
+        pairs = list(self._pair_index)
+        weights = self.weights(pairs)
+        return {
+            pair: dict(zip(self.strategy_names, map(float, weights[i])))
+            for i, pair in enumerate(pairs)
+        }
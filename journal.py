@@ -0,0 +1,267 @@
+"""
+سجل كتابة مؤجلة (Write-Behind Journal) للأوامر والرصيد مع الاستعادة بعد التعطل
+
+- سجل ثنائي بإضافة فقط (append-only)، يُكتب على دفعات من thread منفصل
+- مزامنة واحدة (fsync) لكل دفعة (group commit) خارج مسار التنفيذ
+- لقطات دورية (snapshots) تحد من زمن إعادة التشغيل، ويُفرَّغ السجل بعد كل لقطة
+- أخطاء الكتابة (مثل امتلاء القرص) لا توقف thread الكتابة: تُسجَّل وتُعاد المحاولة مع مؤشر صحة
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+# أنواع الأحداث
+ORDER_PLACED = 1
+ORDER_SETTLED = 2
+BALANCE = 3
+
+# رأس السجل: طول البيانات، CRC32، نوع الحدث، الرقم التسلسلي
+_HEADER = struct.Struct('<IIBQ')
+
+_SNAPSHOT = object()  # علامة داخلية في الطابور لطلب لقطة
+_STOP = object()
+
+
+def _encode(event_type: int, seq: int, payload: Dict) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return _HEADER.pack(len(body), zlib.crc32(body), event_type, seq) + body
+
+
+def _to_dict(obj: Any) -> Any:
+    """ترميز السجلات داخل اللقطة (تُحوَّل في thread الكتابة لا في مسار التنفيذ)"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+class Journal:
+    """سجل الأحداث الدائم"""
+
+    def __init__(self, directory: str, batch_interval: float = 0.05, max_batch: int = 512,
+                 retry_interval: float = 1.0):
+        self.directory = directory
+        self.batch_interval = batch_interval  # أقصى انتظار لتجميع دفعة بعد أول حدث (ثوانٍ)
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval  # الانتظار قبل إعادة محاولة كتابة فاشلة (ثوانٍ)
+        self.journal_path = os.path.join(directory, 'journal.bin')
+        self.snapshot_path = os.path.join(directory, 'snapshot.json')
+
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._valid_size: Optional[int] = None
+        self._size = 0  # حجم السجل بعد آخر كتابة ناجحة
+        self._seq = 0
+        # يضمن أن ترتيب الأرقام التسلسلية في الطابور مطابق لترتيب إسنادها
+        self._lock = threading.Lock()
+        self.events_since_snapshot = 0
+
+        # مؤشر الصحة: False بعد فشل كتابة حتى تنجح كتابة لاحقة
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self._retained = 0  # أحداث فشلت كتابتها وتنتظر إعادة المحاولة
+        self.dropped_events = 0  # أحداث أو لقطات تعذر ترميزها فلم تُكتب
+
+    # ------------------------------------------------------------------
+    # الاستعادة
+    # ------------------------------------------------------------------
+    def recover(self) -> Tuple[Optional[Dict], List[Tuple[int, Dict]]]:
+        """قراءة آخر لقطة وأحداث السجل التي تليها
+
+        يتوقف عند أول سجل ناقص أو تالف (كتابة مقطوعة بسبب تعطل)، ويتجاهل الأحداث
+        المضمّنة مسبقاً في اللقطة (تعطل بين كتابة اللقطة وتفريغ السجل)
+        """
+        snapshot = None
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot.get('journal_seq', 0)
+        self._seq = snapshot_seq
+
+        events = []
+        offset = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'rb') as f:
+                data = f.read()
+            while offset + _HEADER.size <= len(data):
+                length, crc, event_type, seq = _HEADER.unpack_from(data, offset)
+                start = offset + _HEADER.size
+                body = data[start:start + length]
+                if len(body) < length or zlib.crc32(body) != crc:
+                    break
+                if seq > snapshot_seq:
+                    events.append((event_type, json.loads(body.decode('utf-8'))))
+                self._seq = max(self._seq, seq)
+                offset = start + length
+
+        self._valid_size = offset
+        self.events_since_snapshot = len(events)
+        return snapshot, events
+
+    # ------------------------------------------------------------------
+    # الكتابة
+    # ------------------------------------------------------------------
+    def open(self):
+        """فتح السجل للإضافة وبدء thread الكتابة"""
+        if self._thread is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        # بدون تخزين مؤقت: لا تبقى بايتات فشلت كتابتها في الذاكرة لتُكتب لاحقاً بعد الاقتطاع
+        self._file = open(self.journal_path, 'ab', buffering=0)
+        if self._valid_size is not None:
+            # حذف الذيل التالف حتى لا تُضاف السجلات الجديدة بعده
+            self._file.truncate(self._valid_size)
+            self._file.seek(self._valid_size)
+        self._size = self._file.tell()
+
+        self._thread = threading.Thread(target=self._run, name='journal-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, event_type: int, payload: Dict):
+        """إضافة حدث (لا يحجب: الكتابة والمزامنة تتم في الخلفية)"""
+        with self._lock:
+            self._seq += 1
+            self._queue.put((event_type, self._seq, payload))
+            self.events_since_snapshot += 1
+
+    def snapshot(self, state: Dict):
+        """طلب لقطة للحالة الحالية؛ تُكتب بالترتيب بعد جميع الأحداث السابقة ثم يُفرَّغ السجل
+
+        يمكن أن تحتوي الحالة على سجلات (to_dict)؛ تحويلها إلى JSON يتم في thread الكتابة
+        """
+        with self._lock:
+            self._queue.put((_SNAPSHOT, self._seq, dict(state, journal_seq=self._seq)))
+            self.events_since_snapshot = 0
+
+    def get_state(self) -> Dict:
+        """حالة السجل وصحته"""
+        return {
+            'healthy': self.healthy,
+            'last_error': self.last_error,
+            'pending_events': self._queue.qsize() + self._retained,
+            'dropped_events': self.dropped_events,
+            'seq': self._seq
+        }
+
+    def close(self):
+        """كتابة الأحداث المتبقية وإيقاف thread الكتابة"""
+        if self._thread is None:
+            return
+        self._queue.put((_STOP, 0, None))
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+        self._valid_size = None
+
+    def _run(self):
+        batch: List[Tuple] = []
+        while True:
+            if not batch:
+                batch.append(self._queue.get())
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.batch_interval))
+            except queue.Empty:
+                pass
+
+            dropped = self.dropped_events
+            try:
+                if self._write_batch(batch):
+                    return
+            except Exception as e:
+                # أي خطأ لا يوقف thread الكتابة: الدفعة تبقى (دون ما كُتب منها) لإعادة المحاولة بعد مهلة
+                self.healthy = False
+                self.last_error = str(e)
+                self._retained = len(batch)
+                print(f"❌ فشل الكتابة في سجل الأوامر: {e}")
+                if any(item[0] is _STOP for item in batch):
+                    print(f"⚠️ إيقاف السجل مع {len(batch) - 1} حدث غير مكتوب")
+                    return
+                time.sleep(self.retry_interval)
+                continue
+
+            self._retained = 0
+            if self.dropped_events != dropped:
+                # عناصر تعذر ترميزها في هذه الدفعة: تبقى الحالة غير سليمة حتى دفعة نظيفة
+                self.healthy = False
+                continue
+            if not self.healthy:
+                print("✅ استؤنفت الكتابة في سجل الأوامر")
+            self.healthy = True
+            self.last_error = None
+
+    def _write_batch(self, batch: List[Tuple]) -> bool:
+        """كتابة دفعة مع مزامنة واحدة لكل مجموعة أحداث متتالية، ويعيد True عند طلب الإيقاف
+
+        تُحذف العناصر من الدفعة بعد كتابتها، فعند الفشل يبقى فيها ما لم يُكتب فقط
+        """
+        while batch:
+            end = 0
+            while end < len(batch) and batch[end][0] is not _STOP and batch[end][0] is not _SNAPSHOT:
+                end += 1
+            if end:
+                buffer = bytearray()
+                for item in batch[:end]:
+                    try:
+                        buffer += _encode(*item)
+                    except (TypeError, ValueError) as e:
+                        self._drop('حدث', e)
+                self._flush(buffer)
+                del batch[:end]
+                continue
+
+            event_type, _, payload = batch.pop(0)
+            if event_type is _STOP:
+                return True
+            try:
+                self._write_snapshot(payload)
+            except (TypeError, ValueError) as e:
+                # اللقطة التالية تحل محلها؛ السجل لا يُفرَّغ فتبقى الأحداث قابلة للاستعادة
+                self._drop('لقطة', e)
+        return False
+
+    def _drop(self, kind: str, error: Exception):
+        """تسجيل عنصر تعذر ترميزه (إعادة المحاولة لن تنجح)"""
+        self.dropped_events += 1
+        self.last_error = str(error)
+        print(f"❌ تعذر ترميز {kind} في سجل الأوامر: {error}")
+
+    def _flush(self, buffer: bytes):
+        if not buffer:
+            return
+        try:
+            view = memoryview(buffer)
+            while view:
+                view = view[self._file.write(view):]
+            os.fsync(self._file.fileno())
+        except OSError:
+            # حذف أي جزء مكتوب حتى لا تُضاف إعادة المحاولة بعد سجل ناقص
+            try:
+                self._file.truncate(self._size)
+            except OSError:
+                pass
+            raise
+        self._size += len(buffer)
+
+    def _write_snapshot(self, state: Dict):
+        """كتابة اللقطة بشكل ذري ثم تفريغ السجل"""
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, default=_to_dict)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
+        self._size = 0
@@ -0,0 +1,327 @@
+"""
+أداة اختبار الحمل لخادم بوت Pocket Option مع وسيط محلي محاكى
+
+- تحاكي N لوحة تحكم تتبع نمط الاستطلاع في script.js (الحالة، الإحصائيات، السجل، الإشعارات)
+- ترسل دفعات من طلبات /execute_trade
+- تعمل افتراضياً على خادم محلي مع وسيط يطبق واجهة PocketOptionAPI بزمن استجابة ونسبة فشل قابلة للضبط
+- تعرض الإنتاجية وزمن الاستجابة (p50/p99) ونسبة الأخطاء لكل نقطة نهاية
+- الاستجابات الناجحة التي تحتوي أخطاء جزئية (مثل فشل الوسيط لبعض الأزواج في /analyze)
+  تُحتسب كاستجابات متدهورة بنسبة منفصلة
+
+الاستخدام:
+    python -m src.load_test --clients 50 --duration 30 --broker-latency-ms 20 --broker-failure-rate 0.01
+    python -m src.load_test --url http://127.0.0.1:5000/api --clients 20
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from src.pocket_option_api import PocketOptionAPI, TradingEngine
+from src.records import Candle
+
+# نقاط النهاية التي تستطلعها لوحة التحكم كل دورة (startAutoRefresh في script.js)
+DASHBOARD_POLL = [
+    ('GET', '/trading/status'),
+    ('GET', '/trading/statistics'),
+    ('GET', '/trading/trade_history'),
+    ('GET', '/trading/notifications')
+]
+
+
+class MockBroker(PocketOptionAPI):
+    """وسيط محلي يطبق واجهة PocketOptionAPI مع زمن استجابة ونسبة فشل قابلة للضبط"""
+
+    def __init__(self, latency_ms: float = 20.0, jitter_ms: float = 10.0, failure_rate: float = 0.0):
+        super().__init__()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+
+    async def _simulate_network(self, can_fail: bool = True):
+        delay = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if can_fail and random.random() < self.failure_rate:
+            raise ConnectionError('فشل محاكى في الوسيط')
+
+    async def connect(self, email: str = None, password: str = None) -> bool:
+        # الاتصال الأولي لا يفشل حتى يبدأ المحرك؛ الأعطال تُحاكى في الطلبات
+        await self._simulate_network(can_fail=False)
+        self.is_connected = True
+        return True
+
+    async def _fetch_candles(self, pair: str, timeframe: int, count: int) -> List[Candle]:
+        async with self.pool.acquire():
+            await self._simulate_network()
+            return self._build_mock_candles(pair, timeframe, count)
+
+    async def _submit_order(self, order_id: str, pair: str, direction: str, amount: float,
+                            duration: int, entry_price: float) -> Dict:
+        async with self.pool.acquire():
+            await self._simulate_network()
+            return self._settle_mock_order(order_id, pair, direction, amount, duration, entry_price)
+
+
+class Metrics:
+    """تجميع أزمنة الاستجابة والأخطاء لكل نقطة نهاية"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.degraded: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.latencies.clear()
+            self.errors.clear()
+            self.degraded.clear()
+
+    def record(self, endpoint: str, latency: float, ok: bool, degraded: bool = False):
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+            if not ok:
+                self.errors[endpoint] += 1
+            elif degraded:
+                self.degraded[endpoint] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        def percentile(values: List[float], q: float) -> float:
+            if not values:
+                return 0.0
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+        endpoints = {}
+        all_latencies = []
+        total_errors = 0
+        total_degraded = 0
+        for endpoint, values in self.latencies.items():
+            all_latencies.extend(values)
+            total_errors += self.errors[endpoint]
+            total_degraded += self.degraded[endpoint]
+            endpoints[endpoint] = {
+                'requests': len(values),
+                'p50_ms': percentile(values, 50) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'error_rate': self.errors[endpoint] / len(values) * 100,
+                'degraded_rate': self.degraded[endpoint] / len(values) * 100
+            }
+
+        total = len(all_latencies)
+        return {
+            'duration_s': elapsed,
+            'requests': total,
+            'throughput_rps': total / elapsed if elapsed else 0,
+            'p50_ms': percentile(all_latencies, 50) * 1000,
+            'p99_ms': percentile(all_latencies, 99) * 1000,
+            'error_rate': total_errors / total * 100 if total else 0,
+            'degraded_rate': total_degraded / total * 100 if total else 0,
+            'endpoints': endpoints
+        }
+
+
+def has_partial_errors(body: Dict) -> bool:
+    """هل تحتوي استجابة ناجحة على أخطاء لبعض الأزواج (مثل نتائج /analyze)"""
+    data = body.get('data')
+    if not isinstance(data, dict):
+        return False
+    # الاستجابات الجزئية لا تعيد الأزواج الفاشلة إذا لم تتغير أخطاؤها، لذلك تُقرأ failed_pairs أولاً
+    if data.get('failed_pairs'):
+        return True
+    analysis = data.get('analysis')
+    if not isinstance(analysis, dict):
+        return False
+    return any(isinstance(result, dict) and 'error' in result for result in analysis.values())
+
+
+class LoadGenerator:
+    """مولد الحمل: عملاء لوحة تحكم ودفعات تداول"""
+
+    def __init__(self, base_url: str, metrics: Metrics, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.metrics = metrics
+        self.timeout = timeout
+        self.stop_event = threading.Event()
+
+    def request(self, method: str, endpoint: str, body: Optional[Dict] = None,
+                params: Optional[Dict] = None) -> Optional[Dict]:
+        """إرسال طلب وتسجيل زمنه (تحت اسم نقطة النهاية دون المعاملات)، ويعيد الجسم عند النجاح"""
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        query = f'?{urllib.parse.urlencode(params)}' if params else ''
+        req = urllib.request.Request(
+            self.base_url + endpoint + query, data=data, method=method,
+            headers={'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'}
+        )
+        start = time.perf_counter()
+        degraded = False
+        response_body = None
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                payload = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    payload = gzip.decompress(payload)
+            # الأخطاء على مستوى التطبيق (مثل فشل أمر عند الوسيط) تُعاد مع الحالة 200
+            response_body = json.loads(payload)
+            ok = response_body.get('success', True) is not False
+            degraded = ok and has_partial_errors(response_body)
+        except urllib.error.HTTPError as e:
+            e.read()
+            ok = False
+        except Exception:
+            ok = False
+        self.metrics.record(endpoint, time.perf_counter() - start, ok, degraded)
+        return response_body if ok else None
+
+    def dashboard_client(self, poll_interval: float, analyze_every: int):
+        """عميل لوحة تحكم: استطلاع دوري وتحليل السوق كل عدة دورات"""
+        # توزيع بدايات العملاء حتى لا تتزامن جميع الاستطلاعات
+        if self.stop_event.wait(random.uniform(0, poll_interval)):
+            return
+        cycle = 0
+        analysis_version = None  # رمز الإصدار لكل عميل كما في script.js
+        while not self.stop_event.is_set():
+            for method, endpoint in DASHBOARD_POLL:
+                self.request(method, endpoint)
+            cycle += 1
+            if analyze_every and cycle % analyze_every == 0:
+                response = self.request(
+                    'GET', '/trading/analyze',
+                    params={'since': analysis_version} if analysis_version else None
+                )
+                if response is not None:
+                    analysis_version = (response.get('data') or {}).get('version')
+            self.stop_event.wait(poll_interval)
+
+    def trade_bursts(self, pairs: List[str], burst_size: int, burst_interval: float):
+        """دفعات متزامنة من طلبات تنفيذ الصفقات"""
+        while not self.stop_event.wait(burst_interval):
+            threads = [
+                threading.Thread(target=self.request, args=(
+                    'POST', '/trading/execute_trade',
+                    {'pair': random.choice(pairs), 'signal': random.choice(['CALL', 'PUT']), 'confidence': 90}
+                ))
+                for _ in range(burst_size)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    def run(self, clients: int, duration: float, poll_interval: float, analyze_every: int,
+            pairs: List[str], burst_size: int, burst_interval: float) -> float:
+        workers = [
+            threading.Thread(target=self.dashboard_client, args=(poll_interval, analyze_every), daemon=True)
+            for _ in range(clients)
+        ]
+        if burst_size:
+            workers.append(threading.Thread(
+                target=self.trade_bursts, args=(pairs, burst_size, burst_interval), daemon=True
+            ))
+
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        self.stop_event.wait(duration)
+        self.stop_event.set()
+        for worker in workers:
+            worker.join(timeout=self.timeout)
+        return time.perf_counter() - start
+
+
+def start_local_server(broker: MockBroker, port: int):
+    """تشغيل خادم Flask محلي متصل بالوسيط المحاكى في thread منفصل"""
+    from flask import Flask
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from src import trading
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    engine = TradingEngine(journal_dir=None)
+    engine.api = broker
+    trading.set_trading_engine(engine)
+
+    app = Flask(__name__)
+    app.register_blueprint(trading.trading_bp, url_prefix='/api/trading')
+
+    server = make_server('127.0.0.1', port, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/api'
+
+
+def print_report(report: Dict):
+    print(f"\n📈 النتائج خلال {report['duration_s']:.1f} ثانية")
+    print(f"  الطلبات: {report['requests']} | الإنتاجية: {report['throughput_rps']:.1f} طلب/ث")
+    print(
+        f"  p50: {report['p50_ms']:.1f}ms | p99: {report['p99_ms']:.1f}ms | الأخطاء: {report['error_rate']:.2f}% | "
+        f"متدهورة: {report['degraded_rate']:.2f}%"
+    )
+    for endpoint, stats in sorted(report['endpoints'].items()):
+        print(
+            f"  {endpoint:<32} {stats['requests']:>7} طلب | p50 {stats['p50_ms']:>8.1f}ms | "
+            f"p99 {stats['p99_ms']:>8.1f}ms | أخطاء {stats['error_rate']:>5.2f}% | "
+            f"متدهورة {stats['degraded_rate']:>5.2f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='اختبار الحمل لخادم بوت Pocket Option')
+    parser.add_argument('--url', help='عنوان API لخادم قائم (افتراضياً خادم محلي مع وسيط محاكى)')
+    parser.add_argument('--port', type=int, default=0, help='منفذ الخادم المحلي (0 لاختيار منفذ متاح)')
+    parser.add_argument('--clients', type=int, default=20, help='عدد لوحات التحكم المتزامنة')
+    parser.add_argument('--duration', type=float, default=30.0, help='مدة الاختبار بالثواني')
+    parser.add_argument('--poll-interval', type=float, default=10.0, help='فترة الاستطلاع (10 ثوانٍ في script.js)')
+    parser.add_argument('--analyze-every', type=int, default=3, help='طلب /analyze كل N دورات (0 للتعطيل)')
+    parser.add_argument('--burst-size', type=int, default=10, help='عدد طلبات /execute_trade في كل دفعة')
+    parser.add_argument('--burst-interval', type=float, default=5.0, help='الفترة بين الدفعات بالثواني')
+    parser.add_argument('--broker-latency-ms', type=float, default=20.0)
+    parser.add_argument('--broker-jitter-ms', type=float, default=10.0)
+    parser.add_argument('--broker-failure-rate', type=float, default=0.0)
+    parser.add_argument('--json', action='store_true', help='طباعة النتائج بصيغة JSON')
+    args = parser.parse_args()
+
+    broker = MockBroker(args.broker_latency_ms, args.broker_jitter_ms, args.broker_failure_rate)
+    server = None
+    base_url = args.url
+    if not base_url:
+        server, base_url = start_local_server(broker, args.port)
+        print(f"🧪 خادم محلي مع وسيط محاكى على {base_url}")
+
+    metrics = Metrics()
+    generator = LoadGenerator(base_url, metrics)
+    generator.request('POST', '/trading/start')
+    metrics.reset()
+
+    elapsed = generator.run(
+        clients=args.clients,
+        duration=args.duration,
+        poll_interval=args.poll_interval,
+        analyze_every=args.analyze_every,
+        pairs=broker.currency_pairs,
+        burst_size=args.burst_size,
+        burst_interval=args.burst_interval
+    )
+
+    report = metrics.report(elapsed)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+إدارة مجموعة أزواج العملات أثناء التشغيل
+تفعيل/تعطيل الأزواج وتوزيعها على مستويات تقييم (نشط / بطيء) حسب نشاط الإشارات
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+ACTIVE_TIER = 'active'
+SLOW_TIER = 'slow'
+
+
+class PairState:
+    """حالة زوج واحد في جدول التحليل"""
+
+    __slots__ = ('enabled', 'tier', 'last_signal_at', 'last_evaluated_sweep')
+
+    def __init__(self):
+        self.enabled = True
+        self.tier = ACTIVE_TIER
+        self.last_signal_at = time.time()  # الزوج الجديد يبدأ نشطاً
+        self.last_evaluated_sweep = -1
+
+    def to_dict(self) -> Dict:
+        return {
+            'enabled': self.enabled,
+            'tier': self.tier,
+            'last_signal_at': self.last_signal_at
+        }
+
+
+class PairUniverse:
+    """جدول تقييم الأزواج مع مستوى أبطأ للأزواج الخاملة"""
+
+    def __init__(self):
+        self.idle_seconds = 300.0  # مدة بدون إشارات قبل النقل إلى المستوى البطيء
+        self.slow_every = 5  # تقييم أزواج المستوى البطيء مرة كل N جولات
+        self.sweep = 0
+        self._states: Dict[str, PairState] = {}
+        self._lock = threading.Lock()
+
+    def _state(self, pair: str) -> PairState:
+        state = self._states.get(pair)
+        if state is None:
+            state = self._states[pair] = PairState()
+        return state
+
+    def add(self, pair: str):
+        with self._lock:
+            self._state(pair)
+
+    def remove(self, pair: str):
+        with self._lock:
+            self._states.pop(pair, None)
+
+    def set_enabled(self, pair: str, enabled: bool):
+        with self._lock:
+            state = self._state(pair)
+            state.enabled = enabled
+            if enabled:
+                # إعادة التفعيل تعيد الزوج إلى المستوى النشط
+                state.tier = ACTIVE_TIER
+                state.last_signal_at = time.time()
+
+    def is_enabled(self, pair: str) -> bool:
+        state = self._states.get(pair)
+        return state is None or state.enabled
+
+    def due_pairs(self, pairs: List[str]) -> List[str]:
+        """الأزواج المستحقة للتقييم في الجولة الحالية (يبدأ جولة جديدة)"""
+        with self._lock:
+            self.sweep += 1
+            due = []
+            for pair in pairs:
+                state = self._state(pair)
+                if not state.enabled:
+                    continue
+                if (state.tier == ACTIVE_TIER
+                        or self.sweep - state.last_evaluated_sweep >= self.slow_every):
+                    state.last_evaluated_sweep = self.sweep
+                    due.append(pair)
+            return due
+
+    def record_result(self, pair: str, has_signal: bool, now: Optional[float] = None):
+        """تحديث مستوى الزوج حسب وجود إشارة في آخر تقييم"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states.get(pair)
+            if state is None:
+                return
+            if has_signal:
+                state.last_signal_at = now
+                state.tier = ACTIVE_TIER
+            elif now - state.last_signal_at >= self.idle_seconds:
+                state.tier = SLOW_TIER
+
+    def get_state(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {pair: state.to_dict() for pair, state in self._states.items()}
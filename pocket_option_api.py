@@ -3,12 +3,38 @@
 """
 
 import asyncio
+import concurrent.futures
 import json
+import math
+import os
+import random
+import re
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import pandas as pd
+from typing import Dict, List, Optional, Any, Tuple
 from src.trading_strategies import TechnicalAnalysis
+from src.connection_pool import ConnectionPool
+from src.records import Candle, Notification, TradeRecord
+from src.auto_trader import AutoTrader
+from src.consensus import ConsensusEngine
+from src import screener
+from src.pair_universe import PairUniverse
+from src import journal
+from src.analysis_diff import AnalysisVersions
+import numpy as np
+
+# مجلد سجل الأوامر والرصيد الدائم
+DEFAULT_JOURNAL_DIR = os.environ.get(
+    'TRADING_JOURNAL_DIR',
+    os.path.join(os.path.dirname(__file__), 'database', 'journal')
+)
+
+# صيغة أسماء الأزواج المقبولة عند الإضافة أثناء التشغيل، مثل EUR/USD أو EUR/USD OTC
+PAIR_NAME_PATTERN = re.compile(r'^[A-Z]{3}/[A-Z]{3}( OTC)?$')
+
+class _FetchAbandoned(Exception):
+    """الطلب المشترك للشموع أُلغي قبل اكتماله"""
 
 class PocketOptionAPI:
     """فئة للتعامل مع API Pocket Option"""
@@ -16,12 +42,39 @@ class PocketOptionAPI:
     def __init__(self):
         self.is_connected = False
         self.balance = 1000.0  # رصيد افتراضي للاختبار
-        self.currency_pairs = [
-            'EUR/USD', 'EUR/USD OTC', 'EUR/RUB OTC', 'BHD/CNY OTC',
-            'USD/JPY', 'GBP/CAD', 'GBP/USD', 'AUD/USD'
-        ]
+        self._order_seq = 0
+        # أسعار أساسية لكل زوج (تُستخدم في توليد الأسعار الوهمية)
+        self.base_prices = {
+            'EUR/USD': 1.0850,
+            'EUR/USD OTC': 1.0855,
+            'EUR/RUB OTC': 95.50,
+            'BHD/CNY OTC': 18.75,
+            'USD/JPY': 149.80,
+            'GBP/CAD': 1.7250,
+            'GBP/USD': 1.2650,
+            'AUD/USD': 0.6580
+        }
+        self.currency_pairs = list(self.base_prices)
         self.price_data = {}
-        self.technical_analyzer = TechnicalAnalysis()
+        self._technical_analyzer = None
+        
+        # مجمّع اتصالات الوسيط وتجميع الطلبات المتزامنة
+        self.pool = ConnectionPool(size=4)
+        # الطلبات الجارية: (الزوج، الإطار) -> (عدد الشموع، المستقبل)
+        # المستقبلات من concurrent.futures لتُشارك بين طلبات HTTP ذات حلقات الأحداث المختلفة
+        self._inflight: Dict[Tuple[str, int], Tuple[int, concurrent.futures.Future]] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # ذاكرة مؤقتة لآخر سعر تُغذى من الشموع المجلوبة: {الزوج: (السعر، وقت الجلب)}
+        self.last_prices: Dict[str, Tuple[float, float]] = {}
+        self.price_cache_ttl = 1.0  # صلاحية آخر سعر بالثواني
+    
+    @property
+    def technical_analyzer(self) -> TechnicalAnalysis:
+        """محلل فني يُنشأ عند أول استخدام فقط"""
+        if self._technical_analyzer is None:
+            self._technical_analyzer = TechnicalAnalysis()
+        return self._technical_analyzer
         
     async def connect(self, email: str = None, password: str = None) -> bool:
         """الاتصال بـ API (محاكاة)"""
@@ -37,21 +90,7 @@ class PocketOptionAPI:
     
     def generate_mock_prices(self, pair: str, count: int = 100) -> List[float]:
         """توليد أسعار وهمية للاختبار"""
-        import random
-        
-        # أسعار أساسية لكل زوج
-        base_prices = {
-            'EUR/USD': 1.0850,
-            'EUR/USD OTC': 1.0855,
-            'EUR/RUB OTC': 95.50,
-            'BHD/CNY OTC': 18.75,
-            'USD/JPY': 149.80,
-            'GBP/CAD': 1.7250,
-            'GBP/USD': 1.2650,
-            'AUD/USD': 0.6580
-        }
-        
-        base_price = base_prices.get(pair, 1.0000)
+        base_price = self.base_prices.get(pair, 1.0000)
         prices = []
         current_price = base_price
         
@@ -63,33 +102,124 @@ class PocketOptionAPI:
         
         return prices
     
-    async def get_candles(self, pair: str, timeframe: int = 60, count: int = 100) -> List[Dict]:
-        """الحصول على بيانات الشموع"""
+    def add_pair(self, pair: str, base_price: Optional[float] = None) -> bool:
+        """إضافة زوج جديد، ويعيد False إذا كان موجوداً مسبقاً
+
+        يرفع ValueError لاسم زوج غير صالح أو سعر أساسي غير موجب
+        """
+        if not isinstance(pair, str) or not PAIR_NAME_PATTERN.match(pair):
+            raise ValueError(f'اسم زوج غير صالح: {pair!r}')
+        if base_price is not None:
+            if isinstance(base_price, bool) or not isinstance(base_price, (int, float)):
+                raise ValueError(f'سعر أساسي غير صالح: {base_price!r}')
+            if not math.isfinite(base_price) or base_price <= 0:
+                raise ValueError(f'يجب أن يكون السعر الأساسي عدداً موجباً: {base_price!r}')
+            base_price = float(base_price)
+        if pair in self.currency_pairs:
+            return False
+        if base_price is not None:
+            self.base_prices[pair] = base_price
+        self.currency_pairs = self.currency_pairs + [pair]
+        return True
+    
+    def remove_pair(self, pair: str) -> bool:
+        """حذف زوج مع بياناته المخزنة، ويعيد False إذا لم يكن موجوداً"""
+        if pair not in self.currency_pairs:
+            return False
+        # استبدال القائمة بدلاً من تعديلها حتى لا تتأثر جولة تحليل جارية
+        self.currency_pairs = [p for p in self.currency_pairs if p != pair]
+        self.base_prices.pop(pair, None)
+        self.last_prices.pop(pair, None)
+        return True
+    
+    async def get_candles(self, pair: str, timeframe: int = 60, count: int = 100) -> List[Candle]:
+        """الحصول على بيانات الشموع
+
+        الطلبات المتزامنة لنفس الزوج والإطار الزمني تشترك في طلب واحد للوسيط
+        طالما أن الطلب الجاري يغطي عدد الشموع المطلوب
+        """
         if not self.is_connected:
             await self.connect()
         
+        key = (pair, timeframe)
+        while True:
+            with self._inflight_lock:
+                inflight = self._inflight.get(key)
+                if inflight is None or inflight[0] < count:
+                    future = concurrent.futures.Future()
+                    self._inflight[key] = (count, future)
+                    break
+            
+            try:
+                # shield حتى لا يُلغي انتظار أحد المشتركين الطلب على الآخرين
+                candles = await asyncio.shield(asyncio.wrap_future(inflight[1]))
+            except _FetchAbandoned:
+                # أُلغي الطلب المشترك قبل اكتماله: إعادة المحاولة بطلب جديد
+                continue
+            return candles[-count:]
+        
+        try:
+            candles = await self._fetch_candles(pair, timeframe, count)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # إلغاء صاحب الطلب (CancelledError) يجب ألا يترك المنتظرين معلقين
+            future.set_exception(_FetchAbandoned())
+            raise
+        else:
+            future.set_result(candles)
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(key) == (count, future):
+                    del self._inflight[key]
+        
+        if candles:
+            self.last_prices[pair] = (candles[-1].close, time.time())
+        return candles
+    
+    async def _fetch_candles(self, pair: str, timeframe: int, count: int) -> List[Candle]:
+        """جلب الشموع من الوسيط عبر اتصال من المجمّع (محاكاة)"""
+        async with self.pool.acquire():
+            return self._build_mock_candles(pair, timeframe, count)
+    
+    def _build_mock_candles(self, pair: str, timeframe: int, count: int) -> List[Candle]:
+        """توليد شموع وهمية للاختبار"""
         prices = self.generate_mock_prices(pair, count)
         candles = []
         
+        # محاذاة أوقات الشموع مع حدود الإطار الزمني
+        now = int(time.time()) // timeframe * timeframe
+        
         for i, price in enumerate(prices):
-            candle = {
-                'time': int(time.time()) - (count - i) * timeframe,
-                'open': price * random.uniform(0.999, 1.001),
-                'high': price * random.uniform(1.0005, 1.002),
-                'low': price * random.uniform(0.998, 0.9995),
-                'close': price,
-                'volume': random.randint(100, 1000)
-            }
+            candle = Candle(
+                time=now - (count - i) * timeframe,
+                open=price * random.uniform(0.999, 1.001),
+                high=price * random.uniform(1.0005, 1.002),
+                low=price * random.uniform(0.998, 0.9995),
+                close=price,
+                volume=random.randint(100, 1000)
+            )
             candles.append(candle)
         
         return candles
     
     async def get_current_price(self, pair: str) -> float:
-        """الحصول على السعر الحالي"""
+        """الحصول على السعر الحالي (من الذاكرة المؤقتة إن كان حديثاً)"""
+        cached = self.last_prices.get(pair)
+        if cached is not None and time.time() - cached[1] <= self.price_cache_ttl:
+            return cached[0]
+        
         candles = await self.get_candles(pair, count=1)
-        return candles[-1]['close'] if candles else 0.0
+        return candles[-1].close if candles else 0.0
     
-    async def place_order(self, pair: str, direction: str, amount: float, duration: int = 60) -> Dict:
+    def new_order_id(self) -> str:
+        """معرّف أمر جديد (يُحجز قبل الإرسال ليُسجَّل الأمر في السجل الدائم أولاً)"""
+        self._order_seq += 1
+        return f"ORDER_{int(time.time())}_{self._order_seq}"
+    
+    async def place_order(self, pair: str, direction: str, amount: float, duration: int = 60,
+                          order_id: Optional[str] = None) -> Dict:
         """وضع أمر تداول"""
         if not self.is_connected:
             return {'success': False, 'error': 'غير متصل بـ API'}
@@ -97,11 +227,24 @@ class PocketOptionAPI:
         if amount > self.balance:
             return {'success': False, 'error': 'الرصيد غير كافي'}
         
-        order_id = f"ORDER_{int(time.time())}"
-        entry_price = await self.get_current_price(pair)
-        
+        order_id = order_id or self.new_order_id()
+        try:
+            # السعر يُجلب قبل استعارة اتصال الأمر (جلب الشموع يستعير اتصالاً بدوره)
+            entry_price = await self.get_current_price(pair)
+            return await self._submit_order(order_id, pair, direction, amount, duration, entry_price)
+        except ConnectionError as e:
+            return {'success': False, 'error': str(e)}
+    
+    async def _submit_order(self, order_id: str, pair: str, direction: str, amount: float,
+                            duration: int, entry_price: float) -> Dict:
+        """إرسال الأمر إلى الوسيط عبر اتصال من المجمّع (محاكاة)"""
+        async with self.pool.acquire():
+            return self._settle_mock_order(order_id, pair, direction, amount, duration, entry_price)
+    
+    def _settle_mock_order(self, order_id: str, pair: str, direction: str, amount: float,
+                           duration: int, entry_price: float) -> Dict:
+        """محاكاة تنفيذ الأمر ونتيجته"""
         # محاكاة نتيجة التداول
-        import random
         win_probability = 0.65  # نسبة فوز 65%
         is_win = random.random() < win_probability
         
@@ -137,65 +280,118 @@ class PocketOptionAPI:
 class TradingEngine:
     """محرك التداول الرئيسي"""
     
-    def __init__(self):
+    def __init__(self, journal_dir: Optional[str] = DEFAULT_JOURNAL_DIR):
         self.api = PocketOptionAPI()
         self.analyzer = TechnicalAnalysis()
-        self.trade_history = []
-        self.notifications = []
+        self.trade_history: List[TradeRecord] = []
+        self.notifications: List[Notification] = []
         self.is_running = False
         self.min_confidence = 75  # الحد الأدنى للثقة لتنفيذ الصفقة
         self.trade_amount = 10.0  # مبلغ التداول الافتراضي
+        self.auto_trader = AutoTrader()
+        self.consensus = ConsensusEngine(list(self.analyzer.strategies))
+        self.last_strategy_signals: Dict[str, Dict[str, str]] = {}  # آخر إشارات الاستراتيجيات لكل زوج
+        self.universe = PairUniverse()
+        self.last_analysis: Dict[str, Dict] = {}  # آخر نتيجة تحليل لكل زوج (للأزواج غير المستحقة للتقييم)
+        self.analysis_versions = AnalysisVersions()
+        
+        # سجل دائم للأوامر والرصيد (None لتعطيله)
+        self.journal = journal.Journal(journal_dir) if journal_dir else None
+        self.snapshot_every = 500  # عدد الأحداث بين اللقطات
+        self.open_orders: Dict[str, Dict] = {}  # أوامر لم تُسوَّ بعد
+        self._restored = False
+        # يجعل إضافة الصفقة للسجل وأحداثها في السجل الدائم خطوة واحدة (لتبقى اللقطات متسقة)
+        self._record_lock = threading.Lock()
         
     async def start(self):
         """بدء محرك التداول"""
         if not await self.api.connect():
             return False
         
+        if self.journal is not None:
+            if not self._restored:
+                self.restore_from_journal()
+            self.journal.open()
+        
         self.is_running = True
+        self.consensus.fit(self.trade_history)
         print("🚀 تم بدء محرك التداول")
         return True
     
     def stop(self):
         """إيقاف محرك التداول"""
         self.is_running = False
+        self.api.pool.close_all()
+        if self.journal is not None:
+            self.journal.close()
         print("⏹️ تم إيقاف محرك التداول")
     
-    async def analyze_market(self) -> Dict:
-        """تحليل السوق لجميع أزواج العملات"""
+    async def analyze_market(self, since: Optional[str] = None) -> Dict:
+        """تحليل السوق لجميع أزواج العملات
+
+        عند تمرير رمز الإصدار since تُعاد فقط الأزواج التي تغيّرت مخرجاتها منذه
+        """
         if not self.is_running:
             return {'error': 'محرك التداول غير مفعل'}
         
         analysis_results = {}
         high_confidence_signals = []
+        candle_times = {}
         
-        for pair in self.api.currency_pairs:
+        # تقييم الأزواج المستحقة فقط (الأزواج الخاملة تُقيَّم بوتيرة أبطأ)
+        pairs = self.api.currency_pairs
+        for pair in self.universe.due_pairs(pairs):
             try:
-                # الحصول على بيانات الأسعار
-                candles = await self.api.get_candles(pair, count=100)
-                prices = [candle['close'] for candle in candles]
+                # الحصول على بيانات الأسعار (بقدر ما تحتاجه الاستراتيجيات فقط)
+                candles = await self.api.get_candles(pair, count=self.analyzer.required_history())
+                prices = [candle.close for candle in candles]
                 
                 # تحليل الزوج
-                analysis = self.analyzer.analyze_pair(pair, prices)
-                analysis_results[pair] = analysis
-                
-                # التحقق من الإشارات عالية الثقة
-                consensus = analysis.get('consensus', {})
-                if (consensus.get('signal') != 'HOLD' and 
-                    consensus.get('confidence', 0) >= self.min_confidence):
-                    
-                    high_confidence_signals.append({
-                        'pair': pair,
-                        'signal': consensus['signal'],
-                        'confidence': consensus['confidence'],
-                        'strength': consensus['strength'],
-                        'price': analysis['current_price']
-                    })
+                analysis_results[pair] = self.analyzer.analyze_pair(pair, prices)
+                candle_times[pair] = candles[-1].time
                 
             except Exception as e:
                 analysis_results[pair] = {
                     'error': f'خطأ في تحليل {pair}: {str(e)}'
                 }
         
+        # تجاهل الأزواج المحذوفة أثناء انتظار الشموع حتى لا تُعاد حالتها في الإجماع والذاكرة المؤقتة
+        current_pairs = set(self.api.currency_pairs)
+        analysis_results = {pair: analysis for pair, analysis in analysis_results.items() if pair in current_pairs}
+        
+        # الإجماع الموزون لجميع الأزواج دفعة واحدة
+        self.apply_weighted_consensus(analysis_results)
+        
+        # التحقق من الإشارات عالية الثقة
+        for pair, analysis in analysis_results.items():
+            consensus = analysis.get('consensus', {})
+            self.universe.record_result(pair, consensus.get('signal', 'HOLD') != 'HOLD')
+            if (consensus.get('signal', 'HOLD') != 'HOLD' and 
+                consensus.get('confidence', 0) >= self.min_confidence):
+                
+                high_confidence_signals.append({
+                    'pair': pair,
+                    'signal': consensus['signal'],
+                    'confidence': consensus['confidence'],
+                    'strength': consensus['strength'],
+                    'price': analysis['current_price'],
+                    'candle_time': candle_times[pair]
+                })
+        
+        evaluated_pairs = len(analysis_results)
+        failed_pairs = [pair for pair, analysis in analysis_results.items() if 'error' in analysis]
+        self.last_analysis.update(analysis_results)
+        
+        # إكمال النتيجة بآخر تحليل للأزواج المفعلة التي لم تُقيَّم في هذه الجولة
+        for pair in pairs:
+            if pair not in analysis_results and pair in self.last_analysis and self.universe.is_enabled(pair):
+                analysis_results[pair] = self.last_analysis[pair]
+        
+        # التنفيذ التلقائي أولاً لتقليل زمن الاستجابة للإشارة
+        auto_trades = []
+        if self.auto_trader.enabled:
+            auto_trades = await self.auto_execute(high_confidence_signals)
+        
         # إضافة إشعارات للإشارات عالية الثقة
         for signal in high_confidence_signals:
             await self.add_notification(
@@ -204,15 +400,147 @@ class TradingEngine:
                 'high_confidence_signal'
             )
         
+        # إرجاع الأزواج المتغيرة فقط منذ الإصدار الذي يملكه العميل
+        changes = self.analysis_versions.apply(analysis_results, since)
+        
         return {
             'timestamp': datetime.now().isoformat(),
-            'analysis': analysis_results,
+            **changes,
             'high_confidence_signals': high_confidence_signals,
-            'total_pairs': len(self.api.currency_pairs),
-            'signals_found': len(high_confidence_signals)
+            'total_pairs': len(pairs),
+            'evaluated_pairs': evaluated_pairs,
+            'failed_pairs': failed_pairs,
+            'signals_found': len(high_confidence_signals),
+            'auto_trades': auto_trades
         }
     
-    async def execute_trade(self, pair: str, signal: str, confidence: float) -> Dict:
+    def add_pair(self, pair: str, base_price: Optional[float] = None) -> bool:
+        """إضافة زوج أثناء التشغيل (يُقيَّم في الجولة التالية دون إعادة حساب غيره)"""
+        if not self.api.add_pair(pair, base_price):
+            return False
+        self.universe.add(pair)
+        return True
+    
+    def remove_pair(self, pair: str) -> bool:
+        """حذف زوج وجميع حالته من المحرك"""
+        if not self.api.remove_pair(pair):
+            return False
+        self.universe.remove(pair)
+        self.consensus.remove_pair(pair)
+        self.auto_trader.forget_pair(pair)
+        self.last_strategy_signals.pop(pair, None)
+        self.last_analysis.pop(pair, None)
+        return True
+    
+    def set_pair_enabled(self, pair: str, enabled: bool) -> bool:
+        """تفعيل/تعطيل زوج دون حذف حالته"""
+        if pair not in self.api.currency_pairs:
+            return False
+        self.universe.set_enabled(pair, enabled)
+        return True
+    
+    async def screen_market(self, pairs: Optional[List[str]] = None, limit: Optional[int] = None) -> Dict:
+        """فحص متجه لجميع الأزواج وترتيبها حسب قوة الإشارة"""
+        if not self.is_running:
+            return {'error': 'محرك التداول غير مفعل'}
+        
+        pairs = pairs or [p for p in self.api.currency_pairs if self.universe.is_enabled(p)]
+        candles = await asyncio.gather(
+            *[self.api.get_candles(pair, count=self.analyzer.required_history()) for pair in pairs],
+            return_exceptions=True
+        )
+        candles_by_pair = {}
+        errors = []
+        for pair, result in zip(pairs, candles):
+            if isinstance(result, Exception):
+                errors.append({'pair': pair, 'error': f'خطأ في جلب بيانات {pair}: {str(result)}'})
+            else:
+                candles_by_pair[pair] = result
+        
+        pairs, prices = screener.build_price_matrix(candles_by_pair)
+        votes, confidences = screener.screen(
+            prices, self.consensus.strategy_names, self.analyzer.lookbacks(), self.analyzer.warmups()
+        )
+        consensus = self.consensus.score(pairs, votes, confidences)
+        
+        ranked = []
+        for i, pair in enumerate(pairs):
+            ranked.append({
+                'pair': pair,
+                'price': float(prices[i, -1]),
+                'consensus': consensus[i],
+                'strategies': {
+                    name: {
+                        'signal': screener.SIGNAL_NAMES[votes[i, j]],
+                        'confidence': round(float(confidences[i, j]), 2)
+                    }
+                    for j, name in enumerate(self.consensus.strategy_names)
+                }
+            })
+        
+        # الأقوى أولاً: ثقة الإجماع مرجحة بقوة الاتفاق
+        ranked.sort(
+            key=lambda r: r['consensus']['confidence'] * r['consensus']['strength'],
+            reverse=True
+        )
+        
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'ranked': ranked[:limit] if limit else ranked,
+            'errors': errors,
+            'total_pairs': len(pairs) + len(errors),
+            'history_length': int(prices.shape[1]) if prices.size else 0
+        }
+    
+    def apply_weighted_consensus(self, analysis_results: Dict):
+        """استبدال الإجماع البسيط بالإجماع الموزون المراعي للارتباط"""
+        pairs = [pair for pair, analysis in analysis_results.items() if 'strategies' in analysis]
+        if not pairs:
+            return
+        
+        names = self.consensus.strategy_names
+        votes = np.zeros((len(pairs), len(names)))
+        confidences = np.zeros((len(pairs), len(names)))
+        
+        for i, pair in enumerate(pairs):
+            strategies = analysis_results[pair]['strategies']
+            signals = {name: result.signal for name, result in strategies.items()}
+            self.last_strategy_signals[pair] = signals
+            votes[i] = self.consensus.encode(signals)
+            confidences[i] = [strategies[name].confidence if name in strategies else 0 for name in names]
+        
+        self.consensus.observe(votes)
+        for pair, consensus in zip(pairs, self.consensus.score(pairs, votes, confidences)):
+            analysis_results[pair]['consensus'] = consensus
+    
+    async def auto_execute(self, signals: List[Dict]) -> List[Dict]:
+        """تنفيذ الإشارات المؤهلة تلقائياً (الأعلى ثقة أولاً)"""
+        executed = []
+        
+        for signal in sorted(signals, key=lambda s: s['confidence'], reverse=True):
+            reservation, rejection = self.auto_trader.try_reserve(
+                signal['pair'], signal['candle_time'], self.trade_amount, self.api.balance
+            )
+            if rejection:
+                continue
+            
+            try:
+                result = await self.execute_trade(
+                    signal['pair'], signal['signal'], signal['confidence'],
+                    duration=self.auto_trader.order_duration
+                )
+            except BaseException:
+                self.auto_trader.release(reservation)
+                raise
+            
+            # الأمر الفاشل لا يُحتسب في التعرض ولا يمنع إعادة المحاولة
+            if not result.get('success'):
+                self.auto_trader.release(reservation)
+            executed.append(result)
+        
+        return executed
+    
+    async def execute_trade(self, pair: str, signal: str, confidence: float, duration: int = 60) -> Dict:
         """تنفيذ صفقة تداول"""
         if not self.is_running:
             return {'success': False, 'error': 'محرك التداول غير مفعل'}
@@ -220,29 +548,53 @@ class TradingEngine:
         if confidence < self.min_confidence:
             return {'success': False, 'error': f'مستوى الثقة منخفض: {confidence:.1f}%'}
         
+        # تسجيل الأمر في السجل الدائم قبل إرساله: يبقى مفتوحاً بعد التعطل إذا لم تُعرف نتيجته
+        order_id = self.api.new_order_id()
+        with self._record_lock:
+            self.journal_order_placed({
+                'order_id': order_id,
+                'pair': pair,
+                'direction': signal,
+                'amount': self.trade_amount,
+                'duration': duration,
+                'timestamp': datetime.now().isoformat()
+            })
+        
         # تنفيذ الصفقة
         result = await self.api.place_order(
             pair=pair,
             direction=signal,
-            amount=self.trade_amount
+            amount=self.trade_amount,
+            duration=duration,
+            order_id=order_id
         )
         
-        if result.get('success'):
+        if not result.get('success'):
+            with self._record_lock:
+                self.journal_order_failed(order_id, result.get('error'))
+        else:
             # إضافة إلى سجل التداول
-            trade_record = {
-                'id': len(self.trade_history) + 1,
-                'timestamp': result['timestamp'],
-                'pair': pair,
-                'direction': signal,
-                'amount': self.trade_amount,
-                'entry_price': result['entry_price'],
-                'confidence': confidence,
-                'result': result['result'],
-                'profit': result['profit'],
-                'balance': result['new_balance']
-            }
+            with self._record_lock:
+                trade_record = TradeRecord(
+                    id=len(self.trade_history) + 1,
+                    timestamp=result['timestamp'],
+                    pair=pair,
+                    direction=signal,
+                    amount=self.trade_amount,
+                    entry_price=result['entry_price'],
+                    confidence=confidence,
+                    result=result['result'],
+                    profit=result['profit'],
+                    balance=result['new_balance'],
+                    strategies=self.last_strategy_signals.get(pair)
+                )
+                
+                self.trade_history.append(trade_record)
+                self.journal_trade(result, trade_record)
             
-            self.trade_history.append(trade_record)
+            # تحديث أوزان الإجماع بنتيجة الصفقة
+            if trade_record.strategies:
+                self.consensus.record_outcome(pair, trade_record.strategies, signal, trade_record.result)
             
             # إضافة إشعار
             await self.add_notification(
@@ -253,15 +605,83 @@ class TradingEngine:
         
         return result
     
+    # دوال السجل الدائم تُستدعى مع _record_lock حتى تطابق اللقطة الأحداث التي تسبقها،
+    # وتضيف إلى الطابور فقط دون انتظار الكتابة
+    def journal_order_placed(self, order: Dict):
+        """تسجيل أمر قبل إرساله إلى الوسيط"""
+        self.open_orders[order['order_id']] = order
+        if self.journal is not None:
+            self.journal.append(journal.ORDER_PLACED, order)
+    
+    def journal_order_failed(self, order_id: str, error: Optional[str]):
+        """إغلاق أمر رفضه الوسيط دون صفقة"""
+        self.open_orders.pop(order_id, None)
+        if self.journal is not None:
+            self.journal.append(journal.ORDER_SETTLED, {'order_id': order_id, 'error': error})
+            self._maybe_snapshot()
+    
+    def journal_trade(self, order: Dict, trade_record: TradeRecord):
+        """تسجيل تسوية الأمر والصفقة الناتجة والرصيد الجديد"""
+        self.open_orders.pop(order['order_id'], None)
+        if self.journal is None:
+            return
+        
+        self.journal.append(journal.ORDER_SETTLED, {
+            'order_id': order['order_id'],
+            'trade': trade_record.to_dict()
+        })
+        self.journal.append(journal.BALANCE, {'balance': self.api.balance})
+        self._maybe_snapshot()
+    
+    def _maybe_snapshot(self):
+        if self.journal.events_since_snapshot >= self.snapshot_every:
+            # نسخة سطحية فقط (مراجع للسجلات)؛ التحويل إلى JSON يتم في thread الكتابة
+            self.journal.snapshot({
+                'balance': self.api.balance,
+                'trade_history': list(self.trade_history),
+                'open_orders': list(self.open_orders.values())
+            })
+    
+    def restore_from_journal(self):
+        """استعادة الرصيد وسجل التداول والأوامر المفتوحة من آخر لقطة والسجل"""
+        snapshot, events = self.journal.recover()
+        
+        if snapshot:
+            self.api.balance = snapshot['balance']
+            self.trade_history = [TradeRecord.from_dict(t) for t in snapshot['trade_history']]
+            self.open_orders = {o['order_id']: o for o in snapshot['open_orders']}
+        
+        for event_type, payload in events:
+            if event_type == journal.ORDER_PLACED:
+                self.open_orders[payload['order_id']] = payload
+            elif event_type == journal.ORDER_SETTLED:
+                self.open_orders.pop(payload['order_id'], None)
+                if 'trade' in payload:
+                    self.trade_history.append(TradeRecord.from_dict(payload['trade']))
+            elif event_type == journal.BALANCE:
+                self.api.balance = payload['balance']
+        
+        self._restored = True
+        if snapshot or events:
+            print(f"💾 تمت استعادة الحالة: {len(self.trade_history)} صفقة، الرصيد {self.api.balance:.2f}")
+        if self.open_orders:
+            # أوامر أُرسلت قبل التعطل دون تسوية مسجلة: تحتاج مطابقة مع الوسيط
+            print(f"⚠️ {len(self.open_orders)} أمر غير محسوم: {', '.join(self.open_orders)}")
+    
+    def get_journal_state(self) -> Optional[Dict]:
+        """حالة السجل الدائم مع الأوامر غير المحسومة"""
+        if self.journal is None:
+            return None
+        return dict(self.journal.get_state(), open_orders=list(self.open_orders.values()))
+    
     async def add_notification(self, message: str, type: str = 'info'):
         """إضافة إشعار جديد"""
-        notification = {
-            'id': len(self.notifications) + 1,
-            'timestamp': datetime.now().isoformat(),
-            'message': message,
-            'type': type,
-            'read': False
-        }
+        notification = Notification(
+            id=len(self.notifications) + 1,
+            timestamp=datetime.now().isoformat(),
+            message=message,
+            type=type
+        )
         
         self.notifications.append(notification)
         
@@ -269,21 +689,21 @@ class TradingEngine:
         if len(self.notifications) > 100:
             self.notifications = self.notifications[-100:]
     
-    def get_trade_history(self, limit: int = 50) -> List[Dict]:
+    def get_trade_history(self, limit: int = 50) -> List[TradeRecord]:
         """الحصول على سجل التداول"""
         return self.trade_history[-limit:] if self.trade_history else []
     
-    def get_notifications(self, unread_only: bool = False) -> List[Dict]:
+    def get_notifications(self, unread_only: bool = False) -> List[Notification]:
         """الحصول على الإشعارات"""
         if unread_only:
-            return [n for n in self.notifications if not n['read']]
+            return [n for n in self.notifications if not n.read]
         return self.notifications
     
     def mark_notification_read(self, notification_id: int):
         """تمييز إشعار كمقروء"""
         for notification in self.notifications:
-            if notification['id'] == notification_id:
-                notification['read'] = True
+            if notification.id == notification_id:
+                notification.read = True
                 break
     
     def get_statistics(self) -> Dict:
@@ -298,9 +718,9 @@ class TradingEngine:
                 'current_balance': self.api.balance
             }
         
-        winning_trades = len([t for t in self.trade_history if t['result'] == 'WIN'])
-        losing_trades = len([t for t in self.trade_history if t['result'] == 'LOSS'])
-        total_profit = sum([t['profit'] for t in self.trade_history])
+        winning_trades = sum(1 for t in self.trade_history if t.result == 'WIN')
+        losing_trades = sum(1 for t in self.trade_history if t.result == 'LOSS')
+        total_profit = sum(t.profit for t in self.trade_history)
         
         return {
             'total_trades': len(self.trade_history),
@@ -0,0 +1,149 @@
+"""
+أنواع السجلات المضغوطة (__slots__) لبوت Pocket Option
+تُستخدم داخلياً بدلاً من القواميس، ولا تُحوَّل إلى قواميس إلا عند حدود JSON
+"""
+
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+
+@dataclass(slots=True)
+class Candle:
+    """شمعة سعرية واحدة"""
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'time': self.time,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume
+        }
+
+
+@dataclass(slots=True)
+class StrategySignal:
+    """نتيجة استراتيجية تحليل فني واحدة (بدون مؤشرات: بيانات غير كافية أو خطأ)"""
+    signal: str
+    confidence: float
+    reason: str
+
+    # حقول المؤشرات الثابتة لكل استراتيجية (تُضاف إلى القاموس في to_dict فقط)
+    indicator_fields: ClassVar[Tuple[str, ...]] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'signal': self.signal,
+            'confidence': self.confidence,
+            'reason': self.reason
+        }
+        for name in self.indicator_fields:
+            result[name] = getattr(self, name)
+        return result
+
+
+@dataclass(slots=True)
+class TrendSignal(StrategySignal):
+    """نتيجة استراتيجية تتبع الاتجاه"""
+    sma_20: float
+    sma_50: float
+
+    indicator_fields: ClassVar[Tuple[str, ...]] = ('sma_20', 'sma_50')
+
+
+@dataclass(slots=True)
+class RangeSignal(StrategySignal):
+    """نتيجة استراتيجية تداول النطاق"""
+    upper_band: float
+    lower_band: float
+
+    indicator_fields: ClassVar[Tuple[str, ...]] = ('upper_band', 'lower_band')
+
+
+@dataclass(slots=True)
+class BreakoutSignal(StrategySignal):
+    """نتيجة استراتيجية الاختراق"""
+    resistance: float
+    support: float
+
+    indicator_fields: ClassVar[Tuple[str, ...]] = ('resistance', 'support')
+
+
+@dataclass(slots=True)
+class SwingSignal(StrategySignal):
+    """نتيجة استراتيجية التداول المتأرجح"""
+    rsi: float
+    macd: float
+
+    indicator_fields: ClassVar[Tuple[str, ...]] = ('rsi', 'macd')
+
+
+@dataclass(slots=True)
+class ScalpingSignal(StrategySignal):
+    """نتيجة استراتيجية المضاربة السريعة"""
+    ema_5: float
+    ema_10: float
+    price_change: float
+
+    indicator_fields: ClassVar[Tuple[str, ...]] = ('ema_5', 'ema_10', 'price_change')
+
+
+@dataclass(slots=True)
+class TradeRecord:
+    """سجل صفقة منفذة"""
+    id: int
+    timestamp: str
+    pair: str
+    direction: str
+    amount: float
+    entry_price: float
+    confidence: float
+    result: str
+    profit: float
+    balance: float
+    strategies: Optional[Dict[str, str]] = None  # إشارات الاستراتيجيات وقت التنفيذ (لتعلم أوزان الإجماع)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'pair': self.pair,
+            'direction': self.direction,
+            'amount': self.amount,
+            'entry_price': self.entry_price,
+            'confidence': self.confidence,
+            'result': self.result,
+            'profit': self.profit,
+            'balance': self.balance,
+            'strategies': self.strategies
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TradeRecord':
+        return cls(**data)
+
+
+@dataclass(slots=True)
+class Notification:
+    """إشعار للمستخدم"""
+    id: int
+    timestamp: str
+    message: str
+    type: str = 'info'
+    read: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'timestamp': self.timestamp,
+            'message': self.message,
+            'type': self.type,
+            'read': self.read
+        }
@@ -0,0 +1,150 @@
+"""
+فحص متجه لجميع الأزواج دفعة واحدة باستخدام مصفوفة أسعار (أزواج × زمن)
+يعيد آخر إشارة لكل استراتيجية لجميع الأزواج بعمليات NumPy دون حلقات على الأزواج
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.records import Candle
+from src.trading_strategies import EMA_WARMUP_FACTOR, TechnicalAnalysis
+
+HOLD, CALL, PUT = 0.0, 1.0, -1.0
+SIGNAL_NAMES = {CALL: 'CALL', PUT: 'PUT', HOLD: 'HOLD'}
+
+
+def build_price_matrix(candles_by_pair: Dict[str, List[Candle]]) -> Tuple[List[str], np.ndarray]:
+    """بناء مصفوفة أسعار إغلاق متراصفة زمنياً (أزواج × زمن)
+
+    تُقص السلاسل عند أحدث وقت شمعة مشترك ثم تؤخذ أطول نهاية مشتركة
+    """
+    series = {pair: candles for pair, candles in candles_by_pair.items() if candles}
+    if not series:
+        return [], np.zeros((0, 0))
+
+    common_end = min(candles[-1].time for candles in series.values())
+    closes = {}
+    for pair, candles in series.items():
+        end = len(candles)
+        while end > 0 and candles[end - 1].time > common_end:
+            end -= 1
+        closes[pair] = [candle.close for candle in candles[:end]]
+
+    length = min(len(values) for values in closes.values())
+    pairs = list(closes)
+    matrix = np.array([closes[pair][len(closes[pair]) - length:] for pair in pairs], dtype=float)
+    return pairs, matrix
+
+
+def _ema(prices: np.ndarray, period: int) -> np.ndarray:
+    """المتوسط المتحرك الأسي لآخر عمود (مماثل لـ TechnicalAnalysis.calculate_ema)"""
+    if prices.shape[1] < period:
+        return prices[:, -1]
+
+    window = prices[:, -period * EMA_WARMUP_FACTOR:]
+    multiplier = 2 / (period + 1)
+    ema = window[:, :period].mean(axis=1)
+    for t in range(period, window.shape[1]):
+        ema = window[:, t] * multiplier + ema * (1 - multiplier)
+    return ema
+
+
+def _select(call: np.ndarray, put: np.ndarray, call_conf, put_conf, hold_conf) -> Tuple[np.ndarray, np.ndarray]:
+    """تحويل أقنعة الشراء/البيع إلى متجهي إشارة وثقة"""
+    signal = np.where(call, CALL, np.where(put, PUT, HOLD))
+    confidence = np.where(call, call_conf, np.where(put, put_conf, hold_conf)).astype(float)
+    return signal, confidence
+
+
+def _insufficient(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros(n), np.zeros(n)
+
+
+# كل استراتيجية تستقبل حد الإحماء من TechnicalAnalysis.requirements (لا نسخة محلية منه)
+def trend_following(prices: np.ndarray, warmup: int) -> Tuple[np.ndarray, np.ndarray]:
+    n, length = prices.shape
+    if length < warmup:
+        return _insufficient(n)
+    sma_20 = prices[:, -20:].mean(axis=1)
+    sma_50 = prices[:, -50:].mean(axis=1)
+    current = prices[:, -1]
+    confidence = np.minimum(95, 70 + np.abs(current - sma_20) / sma_20 * 100)
+    return _select((sma_20 > sma_50) & (current > sma_20),
+                   (sma_20 < sma_50) & (current < sma_20),
+                   confidence, confidence, 30)
+
+
+def range_trading(prices: np.ndarray, warmup: int) -> Tuple[np.ndarray, np.ndarray]:
+    n, length = prices.shape
+    if length < warmup:
+        return _insufficient(n)
+    window = prices[:, -20:]
+    middle = window.mean(axis=1)
+    std = window.std(axis=1)
+    current = prices[:, -1]
+    return _select(current <= middle - 2 * std, current >= middle + 2 * std, 85, 85, 40)
+
+
+def breakout(prices: np.ndarray, warmup: int) -> Tuple[np.ndarray, np.ndarray]:
+    n, length = prices.shape
+    if length < warmup:
+        return _insufficient(n)
+    window = prices[:, -20:]
+    current = prices[:, -1]
+    return _select(current > window.max(axis=1) * 1.001, current < window.min(axis=1) * 0.999, 90, 90, 35)
+
+
+def swing_trading(prices: np.ndarray, warmup: int) -> Tuple[np.ndarray, np.ndarray]:
+    n, length = prices.shape
+    if length < warmup:
+        return _insufficient(n)
+
+    # RSI لفترة 14
+    deltas = np.diff(prices[:, -15:], axis=1)
+    avg_gain = np.clip(deltas, 0, None).mean(axis=1)
+    avg_loss = np.clip(-deltas, 0, None).mean(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(avg_loss == 0, 100, 100 - 100 / (1 + avg_gain / avg_loss))
+
+    # MACD مع خط الإشارة المبسط (0.8 × MACD)
+    macd_line = _ema(prices, 12) - _ema(prices, 26)
+    signal_line = macd_line * 0.8
+    return _select((rsi < 30) & (macd_line > signal_line), (rsi > 70) & (macd_line < signal_line), 80, 80, 45)
+
+
+def scalping(prices: np.ndarray, warmup: int) -> Tuple[np.ndarray, np.ndarray]:
+    n, length = prices.shape
+    if length < warmup:
+        return _insufficient(n)
+    ema_5 = _ema(prices, 5)
+    ema_10 = _ema(prices, 10)
+    price_change = (prices[:, -1] - prices[:, -2]) / prices[:, -2] * 100
+    return _select((ema_5 > ema_10) & (price_change > 0.01), (ema_5 < ema_10) & (price_change < -0.01), 75, 75, 50)
+
+
+STRATEGIES = {
+    'trend_following': trend_following,
+    'range_trading': range_trading,
+    'breakout': breakout,
+    'swing_trading': swing_trading,
+    'scalping': scalping
+}
+
+
+def screen(prices: np.ndarray, strategy_names: List[str],
+           lookbacks: Optional[Dict[str, int]] = None,
+           warmups: Optional[Dict[str, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """تقييم جميع الاستراتيجيات لجميع الأزواج
+
+    يعيد مصفوفتي التصويت (+1/-1/0) والثقة بأبعاد (أزواج × استراتيجيات)،
+    وتُمرَّر لكل استراتيجية آخر lookbacks[name] عمود فقط إن حُددت، وحد الإحماء warmups[name]
+    (افتراضياً من TechnicalAnalysis.requirements)
+    """
+    warmups = warmups or TechnicalAnalysis().warmups()
+    votes = np.zeros((prices.shape[0], len(strategy_names)))
+    confidences = np.zeros_like(votes)
+    for j, name in enumerate(strategy_names):
+        window = prices[:, -lookbacks[name]:] if lookbacks and name in lookbacks else prices
+        votes[:, j], confidences[:, j] = STRATEGIES[name](window, warmups[name])
+    return votes, confidences
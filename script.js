@@ -2,6 +2,7 @@
 const API_BASE_URL = 'https://Abodtalk.pythonanywhere.com/api';';
 let isConnected = false;
 let refreshInterval = null;
+let analysisVersion = null; // رمز إصدار آخر تحليل معروض لطلب التغييرات فقط
 
 // DOM Elements
 const elements = {
@@ -31,13 +32,22 @@ function hideLoading() {
     elements.loadingOverlay.classList.remove('show');
 }
 
+function escapeHtml(value) {
+    return String(value ?? '')
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+}
+
 function showToast(message, type = 'info') {
     const toast = document.createElement('div');
     toast.className = `toast ${type}`;
     toast.innerHTML = `
         <div style="display: flex; align-items: center; gap: 10px;">
             <i class="fas ${getToastIcon(type)}"></i>
-            <span>${message}</span>
+            <span>${escapeHtml(message)}</span>
         </div>
     `;
     
@@ -141,7 +151,8 @@ async function getStatistics() {
 }
 
 async function analyzeMarket() {
-    return await apiRequest('/trading/analyze');
+    const query = analysisVersion ? `?since=${encodeURIComponent(analysisVersion)}` : '';
+    return await apiRequest(`/trading/analyze${query}`);
 }
 
 async function markNotificationRead(notificationId) {
@@ -197,7 +208,7 @@ function updateTradeHistory(trades) {
     const tradesHtml = trades.map(trade => `
         <div class="trade-row">
             <div class="trade-cell">${formatDateTime(trade.timestamp)}</div>
-            <div class="trade-cell">${trade.pair}</div>
+            <div class="trade-cell">${escapeHtml(trade.pair)}</div>
             <div class="trade-cell">
                 <span class="trade-direction ${trade.direction.toLowerCase()}">
                     ${trade.direction === 'CALL' ? 'شراء' : 'بيع'}
@@ -240,7 +251,7 @@ function updateNotifications(notifications) {
                 </span>
                 <span class="notification-time">${formatTimeAgo(notification.timestamp)}</span>
             </div>
-            <div class="notification-message">${notification.message}</div>
+            <div class="notification-message">${escapeHtml(notification.message)}</div>
         </div>
     `).join('');
     
@@ -256,8 +267,59 @@ function getNotificationTypeText(type) {
     }
 }
 
+function renderAnalysisCard(pair, data) {
+    if (data.error) {
+        return `
+            <div class="analysis-card" data-pair="${escapeHtml(pair)}">
+                <h3><i class="fas fa-exclamation-triangle"></i> ${escapeHtml(pair)}</h3>
+                <p style="color: #ef4444;">${escapeHtml(data.error)}</p>
+            </div>
+        `;
+    }
+    
+    const strategies = data.strategies || {};
+    const consensus = data.consensus || {};
+    
+    return `
+        <div class="analysis-card" data-pair="${escapeHtml(pair)}">
+            <h3><i class="fas fa-chart-line"></i> ${escapeHtml(pair)}</h3>
+            <div style="margin-bottom: 15px;">
+                <strong>السعر الحالي:</strong> <span class="current-price">${formatPrice(data.current_price)}</span>
+            </div>
+            
+            <div style="margin-bottom: 15px;">
+                <strong>الإجماع:</strong>
+                <span class="strategy-signal ${consensus.signal?.toLowerCase() || 'hold'}">
+                    ${getSignalText(consensus.signal)} 
+                    (${(consensus.confidence || 0).toFixed(1)}%)
+                </span>
+            </div>
+            
+            <div class="analysis-strategies">
+                ${Object.entries(strategies).map(([strategyName, strategyData]) => `
+                    <div class="strategy-item">
+                        <span>${getStrategyName(strategyName)}</span>
+                        <span class="strategy-signal ${strategyData.signal?.toLowerCase() || 'hold'}">
+                            ${getSignalText(strategyData.signal)}
+                        </span>
+                    </div>
+                `).join('')}
+            </div>
+        </div>
+    `;
+}
+
+function formatPrice(price) {
+    return price?.toFixed(5) || 'غير متاح';
+}
+
+function findAnalysisCard(pair) {
+    return elements.analysisContainer.querySelector(`.analysis-card[data-pair="${CSS.escape(pair)}"]`);
+}
+
 function updateAnalysis(analysis) {
     if (!analysis || !analysis.analysis) {
+        analysisVersion = null;
         elements.analysisContainer.innerHTML = `
             <div class="no-data">
                 <i class="fas fa-chart-area"></i>
@@ -267,49 +329,38 @@ function updateAnalysis(analysis) {
         return;
     }
     
-    const analysisHtml = Object.entries(analysis.analysis).map(([pair, data]) => {
-        if (data.error) {
-            return `
-                <div class="analysis-card">
-                    <h3><i class="fas fa-exclamation-triangle"></i> ${pair}</h3>
-                    <p style="color: #ef4444;">${data.error}</p>
-                </div>
-            `;
+    // نتيجة كاملة: إعادة رسم جميع البطاقات
+    if (analysis.full || !elements.analysisContainer.querySelector('.analysis-card')) {
+        elements.analysisContainer.innerHTML = Object.entries(analysis.analysis)
+            .map(([pair, data]) => renderAnalysisCard(pair, data))
+            .join('');
+        analysisVersion = analysis.version || null;
+        return;
+    }
+    
+    // نتيجة جزئية: استبدال بطاقات الأزواج المتغيرة فقط
+    Object.entries(analysis.analysis).forEach(([pair, data]) => {
+        const template = document.createElement('template');
+        template.innerHTML = renderAnalysisCard(pair, data).trim();
+        const existing = findAnalysisCard(pair);
+        if (existing) {
+            existing.replaceWith(template.content.firstChild);
+        } else {
+            elements.analysisContainer.appendChild(template.content.firstChild);
         }
-        
-        const strategies = data.strategies || {};
-        const consensus = data.consensus || {};
-        
-        return `
-            <div class="analysis-card">
-                <h3><i class="fas fa-chart-line"></i> ${pair}</h3>
-                <div style="margin-bottom: 15px;">
-                    <strong>السعر الحالي:</strong> ${data.current_price?.toFixed(5) || 'غير متاح'}
-                </div>
-                
-                <div style="margin-bottom: 15px;">
-                    <strong>الإجماع:</strong>
-                    <span class="strategy-signal ${consensus.signal?.toLowerCase() || 'hold'}">
-                        ${getSignalText(consensus.signal)} 
-                        (${(consensus.confidence || 0).toFixed(1)}%)
-                    </span>
-                </div>
-                
-                <div class="analysis-strategies">
-                    ${Object.entries(strategies).map(([strategyName, strategyData]) => `
-                        <div class="strategy-item">
-                            <span>${getStrategyName(strategyName)}</span>
-                            <span class="strategy-signal ${strategyData.signal?.toLowerCase() || 'hold'}">
-                                ${getSignalText(strategyData.signal)}
-                            </span>
-                        </div>
-                    `).join('')}
-                </div>
-            </div>
-        `;
-    }).join('');
+    });
+    
+    (analysis.removed_pairs || []).forEach(pair => findAnalysisCard(pair)?.remove());
+    
+    // تحديث الأسعار في البطاقات غير المتغيرة
+    Object.entries(analysis.prices || {}).forEach(([pair, price]) => {
+        const priceElement = findAnalysisCard(pair)?.querySelector('.current-price');
+        if (priceElement) {
+            priceElement.textContent = formatPrice(price);
+        }
+    });
     
-    elements.analysisContainer.innerHTML = analysisHtml;
+    analysisVersion = analysis.version || null;
 }
 
 function getSignalText(signal) {
@@ -0,0 +1,122 @@
+"""
+طبقة تحويل الاستجابات إلى JSON لبوت Pocket Option
+تدعم مُرمِّزاً أسرع اختيارياً وتقريب الأرقام العشرية وضغط الاستجابات والوضع المختصر
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Response, request
+
+# مُرمِّز orjson اختياري وأسرع بكثير من json القياسي
+try:
+    import orjson
+except ImportError:  # pragma: no cover - يعتمد على البيئة
+    orjson = None
+
+# ضغط brotli اختياري
+try:
+    import brotli
+except ImportError:  # pragma: no cover - يعتمد على البيئة
+    brotli = None
+
+
+class SerializationConfig:
+    """إعدادات طبقة التحويل"""
+
+    def __init__(self):
+        # منازل عشرية لحقول السجلات (الثقة والمؤشرات)؛ {} لتعطيل التقريب
+        # المؤشرات السعرية بخمس منازل كعرض الأسعار في لوحة التحكم، ولا تُقرَّب المبالغ والأسعار الفعلية
+        self.rounded_fields: Dict[str, int] = {
+            'confidence': 2,
+            'rsi': 2,
+            'macd': 6,
+            'price_change': 4,
+            'sma_20': 5,
+            'sma_50': 5,
+            'upper_band': 5,
+            'lower_band': 5,
+            'resistance': 5,
+            'support': 5,
+            'ema_5': 5,
+            'ema_10': 5
+        }
+        self.compression_enabled = True  # تفعيل ضغط الاستجابات
+        self.min_compress_size = 1024  # أصغر حجم (بالبايت) يستحق الضغط
+        self.gzip_level = 5
+        self.brotli_quality = 4
+
+
+config = SerializationConfig()
+
+
+def _record_dict(obj: Any, compact: bool) -> Any:
+    """تحويل سجل إلى قاموس مع تقريب الحقول المحددة وحذف السبب في الوضع المختصر
+
+    يُستدعى من خطاف الترميز للسجلات فقط، فلا تمر بقية الاستجابة بأي معالجة في Python
+    """
+    if hasattr(obj, 'to_dict'):
+        data = obj.to_dict()
+        for field, places in config.rounded_fields.items():
+            value = data.get(field)
+            if isinstance(value, float):
+                data[field] = round(value, places)
+        if compact:
+            data.pop('reason', None)
+        return data
+    if hasattr(obj, 'item'):  # قيم NumPy العددية
+        return obj.item()
+    raise TypeError(f'Type is not JSON serializable: {type(obj).__name__}')
+
+
+def _default(obj: Any) -> Any:
+    """ترميز الأنواع غير المدعومة افتراضياً"""
+    return _record_dict(obj, False)
+
+
+def _default_compact(obj: Any) -> Any:
+    return _record_dict(obj, True)
+
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """ترميز الكائن إلى JSON باستخدام أسرع مُرمِّز متاح"""
+    default = _default_compact if compact else _default
+    if orjson is not None:
+        # السجلات تمر عبر to_dict (لا الترميز الافتراضي للـ dataclass) للحفاظ على شكلها في الاستجابة
+        return orjson.dumps(
+            obj, default=default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _compress(body: bytes) -> Tuple[bytes, Optional[str]]:
+    """ضغط جسم الاستجابة حسب ما يقبله العميل"""
+    if not config.compression_enabled or len(body) < config.min_compress_size:
+        return body, None
+
+    accept_encoding = request.headers.get('Accept-Encoding', '').lower()
+    if brotli is not None and 'br' in accept_encoding:
+        return brotli.compress(body, quality=config.brotli_quality), 'br'
+    if 'gzip' in accept_encoding:
+        return gzip.compress(body, compresslevel=config.gzip_level), 'gzip'
+    return body, None
+
+
+def json_response(payload: Dict, status: int = 200, compact: Optional[bool] = None) -> Response:
+    """بناء استجابة JSON مع التقريب والضغط (بديل عن jsonify)
+
+    يُفعَّل الوضع المختصر من معامل الطلب ?compact=1 ما لم يُحدَّد صراحة
+    """
+    if compact is None:
+        compact = request.args.get('compact', '').lower() in ('1', 'true', 'yes')
+
+    body = dumps(payload, compact)
+    body, encoding = _compress(body)
+
+    response = Response(body, status=status, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
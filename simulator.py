@@ -0,0 +1,213 @@
+"""
+محاكاة التداول الورقي بأسلوب المشي للأمام (Walk-Forward)
+
+- تُسوّى الصفقات مقابل السعر المستقبلي الفعلي من سلسلة أسعار مسجلة أو محاكاة
+- آلاف الحسابات الافتراضية بإعدادات مختلفة (trade_amount / min_confidence) تعمل معاً
+  على نفس السلسلة، مع حساب المؤشرات مرة واحدة فقط لكل خطوة زمنية
+
+الاستخدام:
+    python -m src.simulator --length 2000 --amounts 5,10,20 --confidences 60,65,70,75,80,85,90
+"""
+
+import argparse
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src import screener
+from src.consensus import ConsensusEngine
+from src.trading_strategies import TechnicalAnalysis
+
+
+class PriceFeed:
+    """سلسلة أسعار إغلاق متراصفة لعدة أزواج (أزواج × زمن)"""
+
+    def __init__(self, pairs: List[str], prices: np.ndarray):
+        self.pairs = list(pairs)
+        self.prices = np.asarray(prices, dtype=float)
+
+    @classmethod
+    def simulated(cls, base_prices: Dict[str, float], length: int, volatility: float = 0.002,
+                  seed: Optional[int] = None) -> 'PriceFeed':
+        """سلسلة عشوائية بنفس أسلوب PocketOptionAPI.generate_mock_prices"""
+        rng = np.random.default_rng(seed)
+        changes = rng.uniform(-volatility, volatility, (len(base_prices), length))
+        prices = np.array(list(base_prices.values()))[:, None] * np.cumprod(1 + changes, axis=1)
+        return cls(list(base_prices), np.round(prices, 5))
+
+    @classmethod
+    def load(cls, path: str) -> 'PriceFeed':
+        """تحميل سلسلة مسجلة من ملف JSON بالشكل {الزوج: [أسعار الإغلاق]}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        length = min(len(closes) for closes in data.values())
+        return cls(list(data), np.array([closes[-length:] for closes in data.values()]))
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({pair: self.prices[i].tolist() for i, pair in enumerate(self.pairs)}, f)
+
+
+class VirtualAccounts:
+    """مجموعة حسابات افتراضية مخزنة كمصفوفات لتُحدَّث دفعة واحدة"""
+
+    def __init__(self, trade_amounts: np.ndarray, min_confidences: np.ndarray, initial_balance: float = 1000.0):
+        self.trade_amount = np.asarray(trade_amounts, dtype=float)
+        self.min_confidence = np.asarray(min_confidences, dtype=float)
+        self.initial_balance = initial_balance
+
+        count = len(self.trade_amount)
+        self.balance = np.full(count, initial_balance)
+        self.locked = np.zeros(count)  # مبالغ الصفقات المفتوحة
+        self.peak_equity = np.full(count, initial_balance)
+        self.max_drawdown = np.zeros(count)
+        self.trades = np.zeros(count, dtype=int)
+        self.wins = np.zeros(count, dtype=int)
+        self.losses = np.zeros(count, dtype=int)
+
+    @classmethod
+    def grid(cls, trade_amounts: List[float], min_confidences: List[float], **kwargs) -> 'VirtualAccounts':
+        """حساب لكل تركيبة من الإعدادات"""
+        amounts, confidences = np.meshgrid(trade_amounts, min_confidences, indexing='ij')
+        return cls(amounts.ravel(), confidences.ravel(), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.balance)
+
+    def results(self) -> List[Dict]:
+        closed = np.maximum(self.wins + self.losses, 1)
+        return [
+            {
+                'trade_amount': float(self.trade_amount[i]),
+                'min_confidence': float(self.min_confidence[i]),
+                'final_balance': float(self.balance[i] + self.locked[i]),
+                'profit': float(self.balance[i] + self.locked[i] - self.initial_balance),
+                'total_trades': int(self.trades[i]),
+                'win_rate': float(self.wins[i] / closed[i] * 100),
+                'max_drawdown': float(self.max_drawdown[i])
+            }
+            for i in range(len(self))
+        ]
+
+
+class WalkForwardSimulator:
+    """تشغيل الاستراتيجيات على سلسلة أسعار وتسوية الصفقات مقابل السعر المستقبلي"""
+
+    def __init__(self, feed: PriceFeed, consensus: Optional[ConsensusEngine] = None,
+                 window: Optional[int] = None, duration_bars: int = 1, payout: float = 0.8):
+        analyzer = TechnicalAnalysis()
+        self.feed = feed
+        self.consensus = consensus or ConsensusEngine(list(screener.STRATEGIES))
+        self.lookbacks = analyzer.lookbacks()
+        self.warmups = analyzer.warmups()
+        self.window = window or analyzer.required_history()  # عدد الشموع المستخدمة في التحليل
+        self.duration_bars = duration_bars  # مدة الصفقة بعدد الشموع
+        self.payout = payout  # نسبة الربح عند الفوز
+
+    def run(self, accounts: VirtualAccounts) -> List[Dict]:
+        prices = self.feed.prices
+        pairs = self.feed.pairs
+        length = prices.shape[1]
+        pending: Dict[int, List] = {}  # خطوة التسوية -> [(المبالغ، الحسابات الفائزة، التعادل)]
+
+        for t in range(self.window - 1, length):
+            self._settle(accounts, pending.pop(t, []))
+
+            if t + self.duration_bars >= length:
+                continue
+
+            # حساب المؤشرات والإجماع مرة واحدة لجميع الحسابات
+            window = prices[:, t - self.window + 1:t + 1]
+            votes, confidences = screener.screen(
+                window, self.consensus.strategy_names, self.lookbacks, self.warmups
+            )
+            # تحديث ارتباط الاستراتيجيات كما في apply_weighted_consensus قبل حساب الإجماع
+            self.consensus.observe(votes)
+            consensus = self.consensus.score(pairs, votes, confidences)
+
+            for i, result in enumerate(consensus):
+                if result['signal'] == 'HOLD':
+                    continue
+
+                # الحسابات المؤهلة لهذه الإشارة
+                eligible = (
+                    (result['confidence'] >= accounts.min_confidence)
+                    & (accounts.balance >= accounts.trade_amount)
+                )
+                if not eligible.any():
+                    continue
+
+                stakes = np.where(eligible, accounts.trade_amount, 0.0)
+                accounts.balance -= stakes
+                accounts.locked += stakes
+                accounts.trades += eligible
+
+                move = prices[i, t + self.duration_bars] - prices[i, t]
+                direction = 1 if result['signal'] == 'CALL' else -1
+                pending.setdefault(t + self.duration_bars, []).append(
+                    (stakes, move * direction > 0, move == 0)
+                )
+
+            self._update_drawdown(accounts)
+
+        for step in sorted(pending):
+            self._settle(accounts, pending[step])
+        self._update_drawdown(accounts)
+
+        return accounts.results()
+
+    def _settle(self, accounts: VirtualAccounts, settlements: List):
+        for stakes, is_win, is_tie in settlements:
+            placed = stakes > 0
+            accounts.locked -= stakes
+            if is_tie:
+                accounts.balance += stakes
+            elif is_win:
+                accounts.balance += stakes * (1 + self.payout)
+                accounts.wins += placed
+            else:
+                accounts.losses += placed
+
+    def _update_drawdown(self, accounts: VirtualAccounts):
+        equity = accounts.balance + accounts.locked
+        np.maximum(accounts.peak_equity, equity, out=accounts.peak_equity)
+        np.maximum(accounts.max_drawdown, accounts.peak_equity - equity, out=accounts.max_drawdown)
+
+
+def _parse_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(',') if v]
+
+
+def main():
+    from src.pocket_option_api import PocketOptionAPI
+
+    parser = argparse.ArgumentParser(description='محاكاة التداول الورقي بأسلوب المشي للأمام')
+    parser.add_argument('--feed', help='ملف JSON لسلسلة أسعار مسجلة (افتراضياً سلسلة محاكاة)')
+    parser.add_argument('--length', type=int, default=2000, help='طول السلسلة المحاكاة')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--amounts', default='5,10,20,50', help='قيم trade_amount')
+    parser.add_argument('--confidences', default='60,65,70,75,80,85,90', help='قيم min_confidence')
+    parser.add_argument('--duration', type=int, default=1, help='مدة الصفقة بعدد الشموع')
+    parser.add_argument('--top', type=int, default=10, help='عدد أفضل الإعدادات المعروضة')
+    args = parser.parse_args()
+
+    if args.feed:
+        feed = PriceFeed.load(args.feed)
+    else:
+        feed = PriceFeed.simulated(PocketOptionAPI().base_prices, args.length, seed=args.seed)
+
+    accounts = VirtualAccounts.grid(_parse_list(args.amounts), _parse_list(args.confidences))
+    results = WalkForwardSimulator(feed, duration_bars=args.duration).run(accounts)
+
+    print(f"📊 {len(accounts)} حساب افتراضي، {len(feed.pairs)} زوج، {feed.prices.shape[1]} شمعة")
+    for result in sorted(results, key=lambda r: r['profit'], reverse=True)[:args.top]:
+        print(
+            f"  المبلغ {result['trade_amount']:>6.1f} | الثقة {result['min_confidence']:>5.1f}% | "
+            f"الربح {result['profit']:>9.2f} | الصفقات {result['total_trades']:>5} | "
+            f"الفوز {result['win_rate']:>5.1f}% | أقصى تراجع {result['max_drawdown']:.2f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
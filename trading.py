@@ -3,7 +3,7 @@
 """
 
 from flask import Blueprint, jsonify, request
-from src.pocket_option_api import TradingEngine
+from src.serialization import json_response
 import asyncio
 import threading
 import time
@@ -11,10 +11,30 @@ import time
 # إنشاء Blueprint
 trading_bp = Blueprint('trading', __name__)
 
-# إنشاء محرك التداول العام
-trading_engine = TradingEngine()
+# محرك التداول العام (يُنشأ عند أول طلب لتسريع بدء التشغيل)
+_trading_engine = None
+_engine_lock = threading.Lock()
 engine_started = False
 
+def get_trading_engine():
+    """الحصول على محرك التداول مع إنشائه واستيراد وحداته عند أول استخدام"""
+    global _trading_engine
+    
+    if _trading_engine is None:
+        with _engine_lock:
+            if _trading_engine is None:
+                from src.pocket_option_api import TradingEngine
+                _trading_engine = TradingEngine()
+    return _trading_engine
+
+def set_trading_engine(engine):
+    """استبدال محرك التداول (مثلاً بمحرك متصل بوسيط محاكاة لاختبارات الحمل)"""
+    global _trading_engine, engine_started
+    
+    with _engine_lock:
+        _trading_engine = engine
+        engine_started = False
+
 def run_async_in_thread(coro):
     """تشغيل دالة async في thread منفصل"""
     def run():
@@ -33,12 +53,14 @@ def run_async_in_thread(coro):
 def get_status():
     """الحصول على حالة البوت"""
     global engine_started
+    trading_engine = get_trading_engine()
     
     return jsonify({
         'status': 'running' if engine_started else 'stopped',
         'connected': trading_engine.api.is_connected,
         'balance': trading_engine.api.balance,
         'pairs_count': len(trading_engine.api.currency_pairs),
+        'journal': trading_engine.get_journal_state(),
         'timestamp': time.time()
     })
 
@@ -53,7 +75,7 @@ def start_trading():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
-                result = loop.run_until_complete(trading_engine.start())
+                result = loop.run_until_complete(get_trading_engine().start())
                 return result
             finally:
                 loop.close()
@@ -82,7 +104,7 @@ def stop_trading():
     global engine_started
     
     try:
-        trading_engine.stop()
+        get_trading_engine().stop()
         engine_started = False
         
         return jsonify({
@@ -107,11 +129,17 @@ def analyze_market():
         }), 400
     
     try:
+        # رمز الإصدار الذي يملكه العميل لإرجاع التغييرات فقط
+        since = request.args.get('since')
+        
+        # تشغيل التحليل مرة واحدة فقط (قد يرسل أوامر في وضع التداول التلقائي)
+        outcome = {}
+        
         def run_analysis():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             try:
-                return loop.run_until_complete(trading_engine.analyze_market())
+                outcome['result'] = loop.run_until_complete(get_trading_engine().analyze_market(since))
             finally:
                 loop.close()
         
@@ -119,10 +147,9 @@ def analyze_market():
         thread.start()
         thread.join()
         
-        # الحصول على النتيجة (هذا تبسيط، في التطبيق الحقيقي نحتاج لطريقة أفضل)
-        result = asyncio.run(trading_engine.analyze_market())
+        result = outcome['result']
         
-        return jsonify({
+        return json_response({
             'success': True,
             'data': result
         })
@@ -138,9 +165,10 @@ def get_trade_history():
     """الحصول على سجل التداول"""
     try:
         limit = request.args.get('limit', 50, type=int)
+        trading_engine = get_trading_engine()
         history = trading_engine.get_trade_history(limit)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'data': history,
             'total': len(trading_engine.trade_history)
@@ -157,9 +185,9 @@ def get_notifications():
     """الحصول على الإشعارات"""
     try:
         unread_only = request.args.get('unread_only', False, type=bool)
-        notifications = trading_engine.get_notifications(unread_only)
+        notifications = get_trading_engine().get_notifications(unread_only)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'data': notifications,
             'total': len(notifications)
@@ -175,7 +203,7 @@ def get_notifications():
 def mark_notification_read(notification_id):
     """تمييز إشعار كمقروء"""
     try:
-        trading_engine.mark_notification_read(notification_id)
+        get_trading_engine().mark_notification_read(notification_id)
         
         return jsonify({
             'success': True,
@@ -192,7 +220,7 @@ def mark_notification_read(notification_id):
 def get_statistics():
     """الحصول على إحصائيات التداول"""
     try:
-        stats = trading_engine.get_statistics()
+        stats = get_trading_engine().get_statistics()
         
         return jsonify({
             'success': True,
@@ -231,7 +259,7 @@ def execute_trade():
             asyncio.set_event_loop(loop)
             try:
                 return loop.run_until_complete(
-                    trading_engine.execute_trade(pair, signal, confidence)
+                    get_trading_engine().execute_trade(pair, signal, confidence)
                 )
             finally:
                 loop.close()
@@ -252,7 +280,7 @@ def get_currency_pairs():
     try:
         return jsonify({
             'success': True,
-            'data': trading_engine.api.currency_pairs
+            'data': get_trading_engine().api.currency_pairs
         })
     
     except Exception as e:
@@ -261,3 +289,199 @@ def get_currency_pairs():
             'error': f'فشل في الحصول على أزواج العملات: {str(e)}'
         }), 500
 
+@trading_bp.route('/pairs/status', methods=['GET'])
+def get_pairs_status():
+    """الحصول على حالة الأزواج (مفعل/معطل ومستوى التقييم)"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': get_trading_engine().universe.get_state()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في الحصول على حالة الأزواج: {str(e)}'
+        }), 500
+
+@trading_bp.route('/pairs', methods=['POST'])
+def add_currency_pair():
+    """إضافة زوج عملات أثناء التشغيل"""
+    try:
+        data = request.get_json() or {}
+        pair = data.get('pair')
+        base_price = data.get('base_price')
+        
+        if not pair:
+            return jsonify({
+                'success': False,
+                'error': 'بيانات غير مكتملة'
+            }), 400
+        
+        if not get_trading_engine().add_pair(pair, base_price):
+            return jsonify({
+                'success': False,
+                'error': f'الزوج موجود مسبقاً: {pair}'
+            }), 409
+        
+        return jsonify({
+            'success': True,
+            'message': f'تمت إضافة الزوج {pair}'
+        })
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في إضافة الزوج: {str(e)}'
+        }), 500
+
+@trading_bp.route('/pairs/<path:pair>', methods=['DELETE'])
+def remove_currency_pair(pair):
+    """حذف زوج عملات أثناء التشغيل"""
+    try:
+        if not get_trading_engine().remove_pair(pair):
+            return jsonify({
+                'success': False,
+                'error': f'الزوج غير موجود: {pair}'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': f'تم حذف الزوج {pair}'
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في حذف الزوج: {str(e)}'
+        }), 500
+
+@trading_bp.route('/pairs/<path:pair>/enable', methods=['POST'])
+def enable_currency_pair(pair):
+    """تفعيل زوج عملات"""
+    return _set_pair_enabled(pair, True)
+
+@trading_bp.route('/pairs/<path:pair>/disable', methods=['POST'])
+def disable_currency_pair(pair):
+    """تعطيل زوج عملات"""
+    return _set_pair_enabled(pair, False)
+
+def _set_pair_enabled(pair, enabled):
+    try:
+        if not get_trading_engine().set_pair_enabled(pair, enabled):
+            return jsonify({
+                'success': False,
+                'error': f'الزوج غير موجود: {pair}'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'message': f'تم {"تفعيل" if enabled else "تعطيل"} الزوج {pair}'
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في تحديث حالة الزوج: {str(e)}'
+        }), 500
+
+@trading_bp.route('/auto_trade', methods=['GET'])
+def get_auto_trade():
+    """الحصول على إعدادات وحالة التداول التلقائي"""
+    try:
+        return jsonify({
+            'success': True,
+            'data': get_trading_engine().auto_trader.get_state()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في الحصول على إعدادات التداول التلقائي: {str(e)}'
+        }), 500
+
+@trading_bp.route('/auto_trade', methods=['POST'])
+def configure_auto_trade():
+    """تفعيل/تعطيل التداول التلقائي وتحديث إعداداته"""
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'يجب أن يكون جسم الطلب كائن JSON'
+            }), 400
+        
+        auto_trader = get_trading_engine().auto_trader
+        auto_trader.configure(data)
+        
+        return jsonify({
+            'success': True,
+            'message': 'تم تحديث إعدادات التداول التلقائي',
+            'data': auto_trader.get_state()
+        })
+    
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'إعدادات غير صالحة: {str(e)}'
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في تحديث إعدادات التداول التلقائي: {str(e)}'
+        }), 500
+
+@trading_bp.route('/consensus/weights', methods=['GET'])
+def get_consensus_weights():
+    """الحصول على أوزان الإجماع المتعلمة لكل زوج واستراتيجية"""
+    try:
+        return json_response({
+            'success': True,
+            'data': get_trading_engine().consensus.get_weights()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في الحصول على أوزان الإجماع: {str(e)}'
+        }), 500
+
+@trading_bp.route('/screen', methods=['GET'])
+def screen_market():
+    """فحص متجه لجميع الأزواج وترتيبها حسب قوة الإشارة"""
+    if not engine_started:
+        return jsonify({
+            'success': False,
+            'error': 'محرك التداول غير مفعل'
+        }), 400
+    
+    try:
+        limit = request.args.get('limit', None, type=int)
+        
+        def run_screen():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                return loop.run_until_complete(get_trading_engine().screen_market(limit=limit))
+            finally:
+                loop.close()
+        
+        result = run_screen()
+        
+        return json_response({
+            'success': True,
+            'data': result
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'فشل في فحص السوق: {str(e)}'
+        }), 500
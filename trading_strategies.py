@@ -3,9 +3,14 @@
 تحتوي على 5 استراتيجيات قوية للتحليل الفني
 """
 
-import numpy as np
-import pandas as pd
+from datetime import datetime
 from typing import Dict, List, Tuple, Optional
+from src.records import (
+    BreakoutSignal, RangeSignal, ScalpingSignal, StrategySignal, SwingSignal, TrendSignal
+)
+
+# عدد الشموع المستخدمة لتهيئة EMA كمضاعف لفترته (يكفي لجعل أثر البذرة مهملاً)
+EMA_WARMUP_FACTOR = 3
 
 class TechnicalAnalysis:
     """فئة التحليل الفني مع 5 استراتيجيات قوية"""
@@ -18,6 +23,28 @@ class TechnicalAnalysis:
             'swing_trading': 'التداول المتأرجح',
             'scalping': 'المضاربة السريعة'
         }
+        
+        # متطلبات كل استراتيجية من الشموع:
+        # warmup: أقل عدد لإصدار إشارة، lookback: عدد الشموع التي تُمرَّر لها فعلياً
+        self.requirements = {
+            'trend_following': {'warmup': 50, 'lookback': 50},
+            'range_trading': {'warmup': 20, 'lookback': 20},
+            'breakout': {'warmup': 20, 'lookback': 20},
+            'swing_trading': {'warmup': 26, 'lookback': 26 * EMA_WARMUP_FACTOR},
+            'scalping': {'warmup': 10, 'lookback': 10 * EMA_WARMUP_FACTOR}
+        }
+    
+    def warmups(self) -> Dict[str, int]:
+        """أقل عدد شموع تُصدر عنده كل استراتيجية إشارة"""
+        return {name: req['warmup'] for name, req in self.requirements.items()}
+    
+    def lookbacks(self) -> Dict[str, int]:
+        """عدد الشموع المطلوب لكل استراتيجية"""
+        return {name: req['lookback'] for name, req in self.requirements.items()}
+    
+    def required_history(self) -> int:
+        """عدد الشموع الذي يكفي جميع الاستراتيجيات (حجم الجلب المشترك)"""
+        return max(req['lookback'] for req in self.requirements.values())
     
     def calculate_sma(self, prices: List[float], period: int) -> float:
         """حساب المتوسط المتحرك البسيط"""
@@ -26,13 +53,18 @@ class TechnicalAnalysis:
         return sum(prices[-period:]) / period
     
     def calculate_ema(self, prices: List[float], period: int) -> float:
-        """حساب المتوسط المتحرك الأسي"""
+        """حساب المتوسط المتحرك الأسي
+
+        يُهيَّأ بمتوسط بسيط لأول فترة من آخر (period × EMA_WARMUP_FACTOR) شمعة فقط،
+        فيتناسب العمل مع الفترة وليس مع طول السجل
+        """
         if len(prices) < period:
             return prices[-1] if prices else 0
         
+        window = prices[-period * EMA_WARMUP_FACTOR:]
         multiplier = 2 / (period + 1)
-        ema = prices[0]
-        for price in prices[1:]:
+        ema = sum(window[:period]) / period
+        for price in window[period:]:
             ema = (price * multiplier) + (ema * (1 - multiplier))
         return ema
     
@@ -41,7 +73,8 @@ class TechnicalAnalysis:
         if len(prices) < period + 1:
             return 50
         
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
+        recent = prices[-(period + 1):]
+        deltas = [recent[i] - recent[i-1] for i in range(1, len(recent))]
         gains = [delta if delta > 0 else 0 for delta in deltas]
         losses = [-delta if delta < 0 else 0 for delta in deltas]
         
@@ -84,10 +117,10 @@ class TechnicalAnalysis:
         
         return macd_line, signal_line, histogram
     
-    def strategy_trend_following(self, prices: List[float]) -> Dict:
+    def strategy_trend_following(self, prices: List[float]) -> StrategySignal:
         """استراتيجية تتبع الاتجاه"""
-        if len(prices) < 50:
-            return {'signal': 'HOLD', 'confidence': 0, 'reason': 'بيانات غير كافية'}
+        if len(prices) < self.requirements['trend_following']['warmup']:
+            return StrategySignal('HOLD', 0, 'بيانات غير كافية')
         
         sma_20 = self.calculate_sma(prices, 20)
         sma_50 = self.calculate_sma(prices, 50)
@@ -107,18 +140,12 @@ class TechnicalAnalysis:
             confidence = 30
             reason = 'اتجاه غير واضح'
         
-        return {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': reason,
-            'sma_20': sma_20,
-            'sma_50': sma_50
-        }
+        return TrendSignal(signal, confidence, reason, sma_20=sma_20, sma_50=sma_50)
     
-    def strategy_range_trading(self, prices: List[float]) -> Dict:
+    def strategy_range_trading(self, prices: List[float]) -> StrategySignal:
         """استراتيجية تداول النطاق"""
-        if len(prices) < 20:
-            return {'signal': 'HOLD', 'confidence': 0, 'reason': 'بيانات غير كافية'}
+        if len(prices) < self.requirements['range_trading']['warmup']:
+            return StrategySignal('HOLD', 0, 'بيانات غير كافية')
         
         upper_band, middle_band, lower_band = self.calculate_bollinger_bands(prices)
         current_price = prices[-1]
@@ -137,18 +164,12 @@ class TechnicalAnalysis:
             confidence = 40
             reason = 'السعر في منتصف النطاق'
         
-        return {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': reason,
-            'upper_band': upper_band,
-            'lower_band': lower_band
-        }
+        return RangeSignal(signal, confidence, reason, upper_band=upper_band, lower_band=lower_band)
     
-    def strategy_breakout(self, prices: List[float]) -> Dict:
+    def strategy_breakout(self, prices: List[float]) -> StrategySignal:
         """استراتيجية الاختراق"""
-        if len(prices) < 20:
-            return {'signal': 'HOLD', 'confidence': 0, 'reason': 'بيانات غير كافية'}
+        if len(prices) < self.requirements['breakout']['warmup']:
+            return StrategySignal('HOLD', 0, 'بيانات غير كافية')
         
         # حساب أعلى وأقل سعر في آخر 20 شمعة
         recent_prices = prices[-20:]
@@ -170,18 +191,12 @@ class TechnicalAnalysis:
             confidence = 35
             reason = 'لا يوجد اختراق واضح'
         
-        return {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': reason,
-            'resistance': resistance,
-            'support': support
-        }
+        return BreakoutSignal(signal, confidence, reason, resistance=resistance, support=support)
     
-    def strategy_swing_trading(self, prices: List[float]) -> Dict:
+    def strategy_swing_trading(self, prices: List[float]) -> StrategySignal:
         """استراتيجية التداول المتأرجح"""
-        if len(prices) < 26:
-            return {'signal': 'HOLD', 'confidence': 0, 'reason': 'بيانات غير كافية'}
+        if len(prices) < self.requirements['swing_trading']['warmup']:
+            return StrategySignal('HOLD', 0, 'بيانات غير كافية')
         
         rsi = self.calculate_rsi(prices)
         macd_line, signal_line, histogram = self.calculate_macd(prices)
@@ -200,18 +215,12 @@ class TechnicalAnalysis:
             confidence = 45
             reason = f'RSI: {rsi:.1f} - لا توجد إشارة واضحة'
         
-        return {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': reason,
-            'rsi': rsi,
-            'macd': macd_line
-        }
+        return SwingSignal(signal, confidence, reason, rsi=rsi, macd=macd_line)
     
-    def strategy_scalping(self, prices: List[float]) -> Dict:
+    def strategy_scalping(self, prices: List[float]) -> StrategySignal:
         """استراتيجية المضاربة السريعة"""
-        if len(prices) < 10:
-            return {'signal': 'HOLD', 'confidence': 0, 'reason': 'بيانات غير كافية'}
+        if len(prices) < self.requirements['scalping']['warmup']:
+            return StrategySignal('HOLD', 0, 'بيانات غير كافية')
         
         # حساب المتوسطات المتحركة السريعة
         ema_5 = self.calculate_ema(prices, 5)
@@ -234,14 +243,9 @@ class TechnicalAnalysis:
             confidence = 50
             reason = 'لا يوجد زخم واضح'
         
-        return {
-            'signal': signal,
-            'confidence': confidence,
-            'reason': reason,
-            'ema_5': ema_5,
-            'ema_10': ema_10,
-            'price_change': price_change
-        }
+        return ScalpingSignal(
+            signal, confidence, reason, ema_5=ema_5, ema_10=ema_10, price_change=price_change
+        )
     
     def analyze_pair(self, pair: str, prices: List[float]) -> Dict:
         """تحليل شامل لزوج العملات باستخدام جميع الاستراتيجيات"""
@@ -250,7 +254,7 @@ class TechnicalAnalysis:
             'current_price': prices[-1] if prices else 0,
             'strategies': {},
             'consensus': {},
-            'timestamp': pd.Timestamp.now().isoformat()
+            'timestamp': datetime.now().isoformat()
         }
         
         # تطبيق جميع الاستراتيجيات
@@ -267,18 +271,17 @@ class TechnicalAnalysis:
         
         for strategy_name, method in strategies_methods.items():
             try:
-                result = method(prices)
+                # كل استراتيجية تعالج فقط الشموع التي تحتاجها
+                result = method(prices[-self.requirements[strategy_name]['lookback']:])
                 results['strategies'][strategy_name] = result
                 
-                if result['signal'] != 'HOLD':
-                    signals.append(result['signal'])
-                    confidences.append(result['confidence'])
+                if result.signal != 'HOLD':
+                    signals.append(result.signal)
+                    confidences.append(result.confidence)
             except Exception as e:
-                results['strategies'][strategy_name] = {
-                    'signal': 'ERROR',
-                    'confidence': 0,
-                    'reason': f'خطأ في التحليل: {str(e)}'
-                }
+                results['strategies'][strategy_name] = StrategySignal(
+                    'ERROR', 0, f'خطأ في التحليل: {str(e)}'
+                )
         
         # حساب الإجماع
         if signals: